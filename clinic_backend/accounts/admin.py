@@ -6,7 +6,7 @@ from .models import User, PasswordResetToken
 class UserAdmin(BaseUserAdmin):
     list_display = ['email', 'full_name', 'role', 'is_active', 'created_at']
     list_filter = ['role', 'is_active', 'created_at']
-    search_fields = ['email', 'first_name', 'last_name']
+    search_fields = ['email', 'full_name']
     ordering = ['-created_at']
     
     fieldsets = (
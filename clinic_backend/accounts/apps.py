@@ -7,4 +7,6 @@ class AccountsConfig(AppConfig):
     
     def ready(self):
         import accounts.signals  # noqa
+        from .authentication import check_revocation_cache
+        check_revocation_cache()
 
@@ -0,0 +1,190 @@
+# accounts/authentication.py
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+
+from doctors.models import Doctor
+from patients.models import Patient
+from .models import User
+
+
+class UserCache:
+    """
+    Per-process cache of authenticated users, keyed by id.
+
+    Entries live for AUTH_USER_CACHE_TIMEOUT seconds and are additionally
+    checked against a per-user version stored in Django's cache, which is
+    bumped whenever the user (or their patient/doctor profile) is saved or
+    deleted. With a shared cache backend an admin blocking a user takes
+    effect on every worker immediately; with the local-memory default it is
+    immediate in the worker that handled the change and bounded by the
+    timeout elsewhere.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version_key(user_id):
+        return f'auth-user:{user_id}:version'
+
+    def current_version(self, user_id):
+        key = self._version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key)
+        return version
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        user, version, expires = entry
+        if expires < time.monotonic() or version != self.current_version(user_id):
+            self.discard(user_id)
+            return None
+        # Requests get their own copy, so one view mutating request.user can't leak into another
+        return copy.copy(user)
+
+    def set(self, user, version):
+        with self._lock:
+            if len(self._entries) >= settings.AUTH_USER_CACHE_MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[user.pk] = (user, version, time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate(self, user_id):
+        cache.set(self._version_key(user_id), time.time_ns(), None)
+        self.discard(user_id)
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves the request user from user_cache instead of
+    querying the users table on every request. Patient and doctor profiles
+    are loaded alongside the user, so request.user.patient_profile and
+    request.user.doctor_profile are free too.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # Read the version first so a save racing this load can't be cached as current
+            version = user_cache.current_version(user_id)
+            try:
+                user = User.objects.select_related('patient_profile', 'doctor_profile').get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except User.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            user_cache.set(user, version)
+            user = copy.copy(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+
+def _revocation_key(user_id):
+    return f'auth-revoked:{user_id}'
+
+
+def revoke_token_claims(user_id):
+    """
+    Stop trusting the signed claims of every token issued to the user so far.
+    Such tokens still work, but are authorized against the database again,
+    where e.g. a blocked account is rejected. Kept until any access token
+    minted from an already issued refresh token has expired.
+    """
+    lifetime = api_settings.REFRESH_TOKEN_LIFETIME + api_settings.ACCESS_TOKEN_LIFETIME
+    cache.set(_revocation_key(user_id), int(time.time()), int(lifetime.total_seconds()))
+
+
+# Backends whose entries are private to one process (or not stored at all)
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_revocation_cache():
+    """
+    Revocations must reach every worker, or a user blocked through one of
+    them keeps reading through the others until their token expires.
+    Called at startup.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.AUTH_STATELESS_CLAIMS and backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f'AUTH_STATELESS_CLAIMS needs a cache shared by all workers, but the default cache is {backend}; '
+            'set CACHE_BACKEND/CACHE_LOCATION to e.g. Redis, Memcached or the database cache'
+        )
+
+
+def _user_from_claims(token, user_id):
+    """An unsaved User carrying only what the claims provide, profiles included"""
+    user = User(id=user_id, role=token['role'], is_active=token['is_active'])
+    user._state.adding = False
+    user._state.db = DEFAULT_DB_ALIAS
+    patient_id, doctor_id = token.get('patient_id'), token.get('doctor_id')
+    user._state.fields_cache['patient_profile'] = Patient(id=patient_id, user_id=user_id) if patient_id else None
+    user._state.fields_cache['doctor_profile'] = Doctor(id=doctor_id, user_id=user_id) if doctor_id else None
+    user.from_claims = True
+    return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Stateless mode for read-only endpoints (opt-in via AUTH_STATELESS_CLAIMS).
+
+    When the view lists the current action in `stateless_auth_actions`, the
+    request is safe and the token carries claims from ClaimsRefreshToken,
+    request.user is built from those claims without touching the users
+    table or the user cache. Such a user only has id, role, is_active and
+    the patient/doctor profile ids, so views opt in only where that is all
+    they read. Everything else goes through CachedJWTAuthentication.
+    """
+
+    def authenticate(self, request):
+        view = request.parser_context.get('view') if request.parser_context else None
+        self.stateless = (
+            settings.AUTH_STATELESS_CLAIMS
+            and request.method in SAFE_METHODS
+            and getattr(view, 'action', None) in getattr(view, 'stateless_auth_actions', ())
+        )
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.stateless and self._claims_trusted(validated_token):
+            return _user_from_claims(validated_token, validated_token[api_settings.USER_ID_CLAIM])
+        return super().get_user(validated_token)
+
+    def _claims_trusted(self, token):
+        if 'role' not in token or 'auth_time' not in token or not token.get('is_active'):
+            return False
+        revoked_at = cache.get(_revocation_key(token.get(api_settings.USER_ID_CLAIM)))
+        return revoked_at is None or token['auth_time'] > revoked_at
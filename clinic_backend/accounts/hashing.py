@@ -0,0 +1,87 @@
+# accounts/hashing.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingOverloaded(APIException):
+    """
+    Raised when password hashing capacity is exhausted. DRF turns it into a
+    503 with a Retry-After header, shedding the request instead of queueing it.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, please try again shortly'
+    default_code = 'hashing_overloaded'
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = settings.PASSWORD_HASH_RETRY_AFTER
+
+
+def admission_limit():
+    """
+    Hashing jobs a process admits at once: the pool plus its queue, but
+    always fewer than the process's request threads (WEB_THREADS) so the
+    limit can actually be reached and other endpoints keep a thread. A
+    single-threaded process serves one request at a time anyway.
+    """
+    wanted = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_DEPTH
+    return max(1, min(wanted, settings.WEB_THREADS - 1))
+
+
+# Hashers release the GIL while deriving keys, so a small pool bounds how many
+# CPU-heavy hashes a worker runs at once; the semaphore bounds how many more may wait.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix='password-hash',
+)
+_slots = threading.BoundedSemaphore(admission_limit())
+
+
+def _run(func, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashingOverloaded()
+    try:
+        future = _executor.submit(func, *args)
+    except RuntimeError:
+        _slots.release()
+        raise HashingOverloaded()
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+    except TimeoutError:
+        raise HashingOverloaded()
+
+
+def _check(raw_password, encoded):
+    upgrade = []
+    valid = check_password(raw_password, encoded, setter=upgrade.append)
+    return valid, bool(upgrade)
+
+
+def hash_password(raw_password):
+    """make_password() on the bounded hashing pool"""
+    return _run(make_password, raw_password)
+
+
+def verify_password(user, raw_password):
+    """
+    user.check_password() on the bounded hashing pool. A hash made with an
+    older hasher, or fewer iterations than the preferred hasher (first of
+    PASSWORD_HASHERS) now uses, is re-hashed and saved on success.
+    """
+    valid, needs_upgrade = _run(_check, raw_password, user.password)
+    if valid and needs_upgrade:
+        try:
+            user.password = hash_password(raw_password)
+        except HashingOverloaded:
+            # The upgrade can wait for the next login; don't fail this one
+            return valid
+        user.save(update_fields=['password'])
+    return valid
+
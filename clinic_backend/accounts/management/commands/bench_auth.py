@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.authentication import CachedJWTAuthentication, ClaimsJWTAuthentication, user_cache
+from accounts.models import User
+from accounts.tokens import ClaimsRefreshToken
+from appointments.views import AppointmentViewSet
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request authentication cost: plain JWT, cached user and stateless claims'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='User to authenticate as (default: first patient)')
+        parser.add_argument('--requests', type=int, default=2000, help='Authentications per mode')
+
+    def handle(self, *args, **options):
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+        else:
+            user = User.objects.filter(role='PATIENT', is_active=True).first()
+        if user is None:
+            raise CommandError('No matching active user to benchmark with')
+
+        token = str(ClaimsRefreshToken.for_user(user).access_token)
+        view = AppointmentViewSet()
+        view.action = 'list'
+        factory = RequestFactory()
+
+        def run(authenticator_class):
+            timings = []
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(options['requests']):
+                    request = Request(
+                        factory.get('/api/appointments/', HTTP_AUTHORIZATION=f'Bearer {token}'),
+                        parser_context={'view': view},
+                    )
+                    started = time.perf_counter()
+                    authenticated, _ = authenticator_class().authenticate(request)
+                    # What the permission classes and get_queryset read
+                    authenticated.role, authenticated.pk
+                    timings.append(time.perf_counter() - started)
+            timings.sort()
+            return {
+                'mean_us': sum(timings) / len(timings) * 1e6,
+                'p95_us': timings[int(len(timings) * 0.95)] * 1e6,
+                'queries': len(queries) / options['requests'],
+            }
+
+        user_cache.invalidate(user.pk)
+        results = [('plain JWT (DB lookup)', run(JWTAuthentication)),
+                   ('cached user', run(CachedJWTAuthentication))]
+        with override_settings(AUTH_STATELESS_CLAIMS=True):
+            results.append(('stateless claims', run(ClaimsJWTAuthentication)))
+
+        self.stdout.write(f'{options["requests"]} authentications per mode as {user.email}')
+        baseline = results[0][1]['mean_us']
+        for name, result in results:
+            self.stdout.write(
+                f'{name:<24} mean {result["mean_us"]:8.1f} us   p95 {result["p95_us"]:8.1f} us   '
+                f'queries/request {result["queries"]:.2f}   saving {baseline - result["mean_us"]:8.1f} us'
+            )
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,77 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the login endpoint at several concurrency levels. In-process by default; '
+        'pass --url to drive a running server, which is the only way to see its 503 shedding'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', required=True, help='Existing active user to log in as')
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--concurrency', default='1,4,16,32',
+                            help='Comma separated numbers of simultaneous clients')
+        parser.add_argument('--logins', type=int, default=64, help='Logins per concurrency level')
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://127.0.0.1:8000')
+
+    def handle(self, *args, **options):
+        payload = {'email': options['email'], 'password': options['password']}
+        if options['url']:
+            login = self._http_login(options['url'].rstrip('/') + '/api/accounts/users/login/', payload)
+        else:
+            if not User.objects.filter(email=options['email'], is_active=True).exists():
+                raise CommandError(f'No active user {options["email"]}')
+            login = self._client_login(payload)
+
+        self.stdout.write(f'{"clients":>8} {"logins/s":>10} {"p50 ms":>9} {"p95 ms":>9} {"ok":>5} {"503":>5} {"other":>6}')
+        for concurrency in [int(value) for value in options['concurrency'].split(',')]:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(login, range(options['logins'])))
+            elapsed = time.perf_counter() - started
+
+            latencies = sorted(duration for _, duration in results)
+            codes = [code for code, _ in results]
+            ok, shed = codes.count(200), codes.count(503)
+            self.stdout.write(
+                f'{concurrency:>8} {ok / elapsed:>10.1f} {latencies[len(latencies) // 2] * 1000:>9.1f} '
+                f'{latencies[int(len(latencies) * 0.95)] * 1000:>9.1f} {ok:>5} {shed:>5} {len(codes) - ok - shed:>6}'
+            )
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def _client_login(self, payload):
+        def login(_):
+            started = time.perf_counter()
+            try:
+                response = APIClient().post('/api/accounts/users/login/', payload, format='json')
+            finally:
+                connections.close_all()
+            return response.status_code, time.perf_counter() - started
+        return login
+
+    def _http_login(self, url, payload):
+        body = json.dumps(payload).encode('utf-8')
+
+        def login(_):
+            request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    code = response.status
+            except urllib.error.HTTPError as error:
+                code = error.code
+            except OSError:
+                code = 0
+            return code, time.perf_counter() - started
+        return login
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+def backfill_full_name(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    batch = []
+    for user in User.objects.only('id', 'first_name', 'last_name').iterator(chunk_size=2000):
+        # Same normalization as User.build_full_name (historical models don't carry it)
+        user.full_name = ' '.join(f"{user.first_name or ''} {user.last_name or ''}".split())
+        batch.append(user)
+        if len(batch) >= 2000:
+            User.objects.bulk_update(batch, ['full_name'])
+            batch = []
+    User.objects.bulk_update(batch, ['full_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='full_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=201),
+        ),
+        migrations.RunPython(backfill_full_name, migrations.RunPython.noop),
+    ]
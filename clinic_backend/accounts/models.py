@@ -42,6 +42,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15, blank=True, null=True)
+    # Stored so names can be searched and sorted in SQL; maintained by save()
+    full_name = models.CharField(max_length=201, blank=True, editable=False, db_index=True)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='PATIENT')
     
     is_active = models.BooleanField(default=True)
@@ -63,10 +65,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     def __str__(self):
         return f"{self.email} ({self.role})"
-    
-    @property
-    def full_name(self):
-        return f"{self.first_name} {self.last_name}"
+
+    @staticmethod
+    def build_full_name(first_name, last_name):
+        return ' '.join(f"{first_name or ''} {last_name or ''}".split())
+
+    def save(self, *args, **kwargs):
+        self.full_name = self.build_full_name(self.first_name, self.last_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'full_name'}
+        super().save(*args, **kwargs)
 
 
 class PasswordResetToken(models.Model):
@@ -2,8 +2,10 @@
 
 from rest_framework import serializers
 from .models import User, PasswordResetToken
+from clinic_backend.serializers import DynamicFieldsMixin
+from .hashing import hash_password
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
     full_name = serializers.CharField(read_only=True)
     full_name = serializers.CharField(read_only=True)
@@ -15,6 +17,10 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'password', 'first_name', 'last_name', 
                   'phone', 'role', 'is_active', 'full_name', 'created_at', 'patient_id', 'doctor_id']
         read_only_fields = ['id', 'created_at']
+        field_relations = {
+            'patient_id': ['patient_profile'],
+            'doctor_id': ['doctor_profile'],
+        }
     
     def get_patient_id(self, obj):
         if hasattr(obj, 'patient_profile'):
@@ -28,18 +34,16 @@ class UserSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         password = validated_data.pop('password', None)
-        user = User.objects.create(**validated_data)
         if password:
-            user.set_password(password)
-            user.save()
-        return user
+            validated_data['password'] = hash_password(password)
+        return User.objects.create(**validated_data)
     
     def update(self, instance, validated_data):
         password = validated_data.pop('password', None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         if password:
-            instance.set_password(password)
+            instance.password = hash_password(password)
         instance.save()
         return instance
 
@@ -62,10 +66,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('confirm_password')
         password = validated_data.pop('password')
         validated_data['role'] = 'PATIENT'
-        user = User.objects.create(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        return User.objects.create(password=hash_password(password), **validated_data)
 
 
 class LoginSerializer(serializers.Serializer):
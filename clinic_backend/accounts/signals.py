@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from accounts.models import User
@@ -28,3 +28,24 @@ def create_doctor_profile(sender, instance, created, **kwargs):
     Note: This requires department selection, so it's better to do this manually
     """
     pass
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the user from the authentication cache so changes such as
+    block_user/activate_user apply to the very next request
+    """
+    from accounts.authentication import user_cache
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender='patients.Patient')
+@receiver(post_delete, sender='patients.Patient')
+@receiver(post_save, sender='doctors.Doctor')
+@receiver(post_delete, sender='doctors.Doctor')
+def invalidate_cached_profile_user(sender, instance, **kwargs):
+    """Cached users carry their patient/doctor profile, so refresh them with it"""
+    from accounts.authentication import user_cache
+    user_cache.invalidate(instance.user_id)
@@ -0,0 +1,37 @@
+# accounts/tokens.py
+
+import time
+
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def _profile_id(user, attr):
+    try:
+        return getattr(user, attr).id
+    except ObjectDoesNotExist:
+        return None
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token that also signs the claims needed to authorize a request:
+    role, patient_id, doctor_id and is_active. auth_time records when the
+    claims were read from the database; it is copied into every access token
+    minted from this refresh token, so revocations can be checked against it.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['patient_id'] = _profile_id(user, 'patient_profile')
+        token['doctor_id'] = _profile_id(user, 'doctor_profile')
+        token['is_active'] = user.is_active
+        token['auth_time'] = int(time.time())
+        return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
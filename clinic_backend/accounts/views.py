@@ -4,7 +4,6 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
@@ -16,6 +15,10 @@ from .models import User, PasswordResetToken
 from .serializers import (UserSerializer, UserRegistrationSerializer, LoginSerializer,
                          ForgotPasswordSerializer, VerifyResetTokenSerializer, ResetPasswordSerializer)
 from .permissions import IsAdmin
+from .authentication import revoke_token_claims
+from .hashing import hash_password, verify_password
+from .tokens import ClaimsRefreshToken
+from clinic_backend.serializers import OptimizedQuerysetMixin
 from doctors.models import Doctor, Department
 import string
 import secrets
@@ -34,12 +37,13 @@ def send_email_async(subject, message, from_email, recipient_list):
     except Exception as e:
         print(f"Error sending email: {str(e)}")
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['first_name', 'last_name', 'email', 'phone']
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['full_name', 'email', 'phone']
+    ordering_fields = ['full_name', 'email', 'created_at']
     
     def get_permissions(self):
         if self.action in ['register', 'login', 'forgot_password', 'verify_reset_token', 'reset_password']:
@@ -48,6 +52,11 @@ class UserViewSet(viewsets.ModelViewSet):
             return [IsAdmin()]
         return [IsAuthenticated()]
     
+    def perform_update(self, serializer):
+        user = serializer.save()
+        # Role or status may have changed, so tokens must not vouch for the old values
+        revoke_token_claims(user.id)
+
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def register(self, request):
         """
@@ -56,7 +65,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             return Response({
                 'message': 'User registered successfully',
                 'user': UserSerializer(user).data,
@@ -79,14 +88,14 @@ class UserViewSet(viewsets.ModelViewSet):
             
             # Try to get user by email and check password
             try:
-                user = User.objects.get(email=email)
-                if user.check_password(password):
+                user = User.objects.select_related('patient_profile', 'doctor_profile').get(email=email)
+                if verify_password(user, password):
                     if not user.is_active:
                         return Response({
                             'error': 'Account is blocked. Contact admin.'
                         }, status=status.HTTP_403_FORBIDDEN)
                     
-                    refresh = RefreshToken.for_user(user)
+                    refresh = ClaimsRefreshToken.for_user(user)
                     return Response({
                         'message': 'Login successful',
                         'user': UserSerializer(user).data,
@@ -127,6 +136,9 @@ class UserViewSet(viewsets.ModelViewSet):
         if User.objects.filter(email=email).exists():
             return Response({'error': 'User with this email already exists'}, 
                           status=status.HTTP_400_BAD_REQUEST)
+
+        # Hash before opening the transaction so it isn't held open meanwhile
+        encoded_password = hash_password(password)
         
         try:
             with transaction.atomic():
@@ -137,9 +149,9 @@ class UserViewSet(viewsets.ModelViewSet):
                     last_name=data.get('last_name'),
                     phone=data.get('phone', ''),
                     role='DOCTOR',
-                    is_active=True
+                    is_active=True,
+                    password=encoded_password,
                 )
-                user.set_password(password)
                 user.save()
                 
                 # 2. Create Doctor Profile
@@ -194,6 +206,7 @@ class UserViewSet(viewsets.ModelViewSet):
         user = self.get_object()
         user.is_active = False
         user.save()
+        revoke_token_claims(user.id)
         return Response({
             'message': f'User {user.email} has been blocked'
         }, status=status.HTTP_200_OK)
@@ -326,7 +339,7 @@ Hospital Management System
             user = reset_token.user
             
             # Set new password
-            user.set_password(password)
+            user.password = hash_password(password)
             user.save()
             
             # Mark token as used
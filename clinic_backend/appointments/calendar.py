@@ -0,0 +1,80 @@
+# appointments/calendar.py
+
+from collections import defaultdict
+from datetime import timedelta
+
+from doctors.models import Doctor, DoctorSlot
+from .models import Appointment
+
+MAX_DAYS = 31
+WEEKDAYS = [code for code, _ in DoctorSlot.WEEKDAY_CHOICES]  # Monday first, as date.weekday()
+# Cancelled and rejected bookings don't take up the doctor's time
+DEFAULT_STATUSES = ('PENDING', 'APPROVED', 'VISITED')
+
+
+def doctor_calendar(doctors, start, end, statuses=DEFAULT_STATUSES):
+    """
+    Day-by-day calendar of `doctors` (a Doctor queryset) from `start` to
+    `end`: each day lists the doctors' active slot windows for that weekday
+    and their appointments with compact patient details. Appointments come
+    from one query ordered along appt_doctor_date_time_idx; slots and
+    doctor names take one query each.
+    """
+    doctors = {doctor_id: name for doctor_id, name in doctors.values_list('id', 'user__full_name')}
+
+    slots = defaultdict(list)
+    windows = (DoctorSlot.objects.filter(doctor_id__in=doctors, is_active=True)
+               .order_by('start_time', 'doctor_id')
+               .values_list('weekday', 'doctor_id', 'start_time', 'end_time'))
+    for weekday, doctor_id, start_time, end_time in windows:
+        slots[weekday].append({'doctor': doctor_id, 'start_time': start_time, 'end_time': end_time})
+
+    appointments = defaultdict(list)
+    rows = (Appointment.objects
+            .filter(doctor_id__in=doctors, appointment_date__gte=start, appointment_date__lte=end,
+                    status__in=statuses)
+            .order_by('doctor_id', 'appointment_date', 'appointment_time', 'id')
+            .values_list('id', 'doctor_id', 'appointment_date', 'appointment_time', 'status', 'case_type',
+                         'reason', 'patient_id', 'patient__uhid', 'patient__user__full_name'))
+    for (appointment_id, doctor_id, day, time, status, case_type,
+         reason, patient_id, uhid, patient_name) in rows:
+        appointments[day].append({
+            'id': appointment_id,
+            'doctor': doctor_id,
+            'time': time,
+            'status': status,
+            'case_type': case_type,
+            'reason': reason,
+            'patient': {'id': patient_id, 'uhid': uhid, 'name': patient_name},
+        })
+
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        weekday = WEEKDAYS[day.weekday()]
+        days.append({
+            'date': day,
+            'weekday': weekday,
+            'slots': slots.get(weekday, []),
+            # Doctors' appointments interleaved by time
+            'appointments': sorted(appointments.get(day, []), key=lambda a: (a['time'], a['doctor'], a['id'])),
+        })
+
+    return {
+        'start': start,
+        'end': end,
+        'doctors': [{'id': doctor_id, 'name': name} for doctor_id, name in sorted(doctors.items())],
+        'days': days,
+    }
+
+
+def calendar_doctors(user, params):
+    """Doctors whose calendar `user` asked for, or an error message"""
+    if user.role == 'DOCTOR':
+        return Doctor.objects.filter(id=user.doctor_profile.id), None
+    for param, field in (('doctor_id', 'id'), ('department_id', 'department_id')):
+        if params.get(param):
+            if not params[param].isdigit():
+                return None, f'{param} must be an integer'
+            return Doctor.objects.filter(**{field: int(params[param])}), None
+    return None, 'doctor_id or department_id is required'
@@ -0,0 +1,69 @@
+# appointments/links.py
+
+from datetime import datetime
+
+from django.utils import timezone
+
+
+def visit_time(appointment_date, appointment_time):
+    """The aware datetime an appointment is booked for"""
+    return timezone.make_aware(datetime.combine(appointment_date, appointment_time))
+
+
+def refresh_link(doctor_id, patient_id):
+    """
+    Recompute the DoctorPatientLink of one pair from its appointments, or
+    drop it when none are left. Reads only that pair's appointments.
+    """
+    from .models import Appointment, DoctorPatientLink
+
+    visits = list(
+        Appointment.objects.filter(doctor_id=doctor_id, patient_id=patient_id)
+        .order_by('appointment_date', 'appointment_time')
+        .values_list('appointment_date', 'appointment_time')
+    )
+    if not visits:
+        DoctorPatientLink.objects.filter(doctor_id=doctor_id, patient_id=patient_id).delete()
+        return None
+    link, _ = DoctorPatientLink.objects.update_or_create(
+        doctor_id=doctor_id,
+        patient_id=patient_id,
+        defaults={
+            'first_visit': visit_time(*visits[0]),
+            'last_visit': visit_time(*visits[-1]),
+            'appointment_count': len(visits),
+        },
+    )
+    return link
+
+
+def rebuild_links(appointment_model, link_model, batch_size=2000):
+    """
+    Regenerate every link in one ordered pass over the appointments. Takes
+    the model classes so data migrations can pass their historical models.
+    Returns the number of links created.
+    """
+    link_model.objects.all().delete()
+    rows = (appointment_model.objects
+            .order_by('doctor_id', 'patient_id', 'appointment_date', 'appointment_time')
+            .values_list('doctor_id', 'patient_id', 'appointment_date', 'appointment_time'))
+
+    batch = []
+    created = 0
+    current = None
+    for doctor_id, patient_id, appointment_date, appointment_time in rows.iterator(chunk_size=batch_size):
+        visit = visit_time(appointment_date, appointment_time)
+        if current is not None and (current.doctor_id, current.patient_id) == (doctor_id, patient_id):
+            current.last_visit = visit
+            current.appointment_count += 1
+            continue
+        current = link_model(doctor_id=doctor_id, patient_id=patient_id,
+                             first_visit=visit, last_visit=visit, appointment_count=1)
+        batch.append(current)
+        if len(batch) > batch_size:
+            # Everything but the pair still being counted is complete
+            link_model.objects.bulk_create(batch[:-1])
+            created += len(batch) - 1
+            batch = batch[-1:]
+    link_model.objects.bulk_create(batch)
+    return created + len(batch)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from appointments.links import rebuild_links
+from appointments.models import Appointment, DoctorPatientLink
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the doctor-patient link table from existing appointments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Links per bulk insert')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_links(Appointment, DoctorPatientLink, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Linked {created} doctor-patient pairs'))
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:23
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def build_links(apps, schema_editor):
+    # Frozen copy of appointments.links.rebuild_links as of this migration
+    Appointment = apps.get_model('appointments', 'Appointment')
+    DoctorPatientLink = apps.get_model('appointments', 'DoctorPatientLink')
+    rows = (Appointment.objects
+            .order_by('doctor_id', 'patient_id', 'appointment_date', 'appointment_time')
+            .values_list('doctor_id', 'patient_id', 'appointment_date', 'appointment_time'))
+
+    batch = []
+    current = None
+    for doctor_id, patient_id, appointment_date, appointment_time in rows.iterator(chunk_size=2000):
+        visit = timezone.make_aware(datetime.combine(appointment_date, appointment_time))
+        if current is not None and (current.doctor_id, current.patient_id) == (doctor_id, patient_id):
+            current.last_visit = visit
+            current.appointment_count += 1
+            continue
+        current = DoctorPatientLink(doctor_id=doctor_id, patient_id=patient_id,
+                                    first_visit=visit, last_visit=visit, appointment_count=1)
+        batch.append(current)
+        if len(batch) > 2000:
+            # Everything but the pair still being counted is complete
+            DoctorPatientLink.objects.bulk_create(batch[:-1])
+            batch = batch[-1:]
+    DoctorPatientLink.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_doctor_created_by'),
+        ('patients', '0005_patientsearchtoken'),
+        ('appointments', '0005_appointment_appt_date_time_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorPatientLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_visit', models.DateTimeField()),
+                ('last_visit', models.DateTimeField()),
+                ('appointment_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_links', to='doctors.doctor')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='doctor_links', to='patients.patient')),
+            ],
+            options={
+                'db_table': 'doctor_patient_links',
+                'indexes': [models.Index(fields=['doctor', '-last_visit'], name='link_doctor_last_visit_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='doctorpatientlink',
+            constraint=models.UniqueConstraint(fields=('doctor', 'patient'), name='unique_doctor_patient_link'),
+        ),
+        migrations.RunPython(build_links, migrations.RunPython.noop),
+    ]
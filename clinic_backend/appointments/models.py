@@ -30,6 +30,37 @@ class Appointment(models.Model):
     class Meta:
         db_table = 'appointments'
         ordering = ['-appointment_date', '-appointment_time']
+        indexes = [
+            models.Index(fields=['-appointment_date', '-appointment_time', '-id'], name='appt_date_time_idx'),
+            models.Index(fields=['patient', '-appointment_date', '-appointment_time', '-id'], name='appt_patient_date_idx'),
+            models.Index(fields=['doctor', 'appointment_date', 'appointment_time'], name='appt_doctor_date_time_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.patient.user.full_name} with Dr. {self.doctor.user.full_name} on {self.appointment_date}"
\ No newline at end of file
+        return f"{self.patient.user.full_name} with Dr. {self.doctor.user.full_name} on {self.appointment_date}"
+
+
+class DoctorPatientLink(models.Model):
+    """
+    One row per doctor/patient pair that has any appointment together, kept
+    up to date from Appointment saves and deletes. Doctors' patient lists and
+    access checks read this instead of de-duplicating their appointments.
+    """
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='patient_links')
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='doctor_links')
+    first_visit = models.DateTimeField()
+    last_visit = models.DateTimeField()
+    appointment_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'doctor_patient_links'
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'patient'], name='unique_doctor_patient_link'),
+        ]
+        indexes = [
+            models.Index(fields=['doctor', '-last_visit'], name='link_doctor_last_visit_idx'),
+        ]
+
+    def __str__(self):
+        return f"Dr. {self.doctor_id} - patient {self.patient_id} ({self.appointment_count})"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Appointment
+from clinic_backend.serializers import DynamicFieldsMixin
 
 class SimplePatientSerializer(serializers.Serializer):
     """Simplified patient serializer for nested use in appointments"""
@@ -16,7 +17,7 @@ class SimpleDoctorSerializer(serializers.Serializer):
     specialization = serializers.CharField()
     department_name = serializers.CharField(source='department.name')
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     patient_details = SimplePatientSerializer(source='patient', read_only=True)
     doctor_details = SimpleDoctorSerializer(source='doctor', read_only=True)
     patient_name = serializers.CharField(source='patient.user.full_name', read_only=True)
@@ -37,6 +38,17 @@ class AppointmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['patient_details', 'doctor_details', 'patient_name', 'patient_uhid', 
                            'doctor_name', 'has_billing', 'billing_status', 'has_prescription', 
                            'prescription_id', 'prescription_info', 'created_at', 'updated_at']
+        expandable_fields = {
+            'patient': 'patients.serializers.PatientSerializer',
+            'doctor': 'doctors.serializers.DoctorSerializer',
+        }
+        field_relations = {
+            'has_billing': ['billing'],
+            'billing_status': ['billing'],
+            'has_prescription': ['prescriptions'],
+            'prescription_id': ['prescriptions'],
+            'prescription_info': ['prescriptions'],
+        }
     
     def get_has_billing(self, obj):
         """Check if appointment has associated billing"""
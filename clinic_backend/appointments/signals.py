@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .links import refresh_link
+from .models import Appointment
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_appointment_pair(sender, instance, raw=False, **kwargs):
+    """Note the stored doctor/patient so a reassigned appointment also refreshes the old pair"""
+    instance._previous_pair = None
+    if instance.pk and not raw:
+        instance._previous_pair = (Appointment.objects
+                                   .filter(pk=instance.pk)
+                                   .values_list('doctor_id', 'patient_id')
+                                   .first())
+
+
+@receiver(post_save, sender=Appointment)
+def link_appointment_pair(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    pair = (instance.doctor_id, instance.patient_id)
+    previous = getattr(instance, '_previous_pair', None)
+    if previous and previous != pair:
+        refresh_link(*previous)
+    refresh_link(*pair)
+
+
+@receiver(post_delete, sender=Appointment)
+def unlink_appointment_pair(sender, instance, **kwargs):
+    refresh_link(instance.doctor_id, instance.patient_id)
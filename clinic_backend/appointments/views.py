@@ -2,20 +2,34 @@ from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from datetime import timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .models import Appointment
+from .calendar import DEFAULT_STATUSES, MAX_DAYS, calendar_doctors, doctor_calendar
 from .serializers import AppointmentSerializer
 from accounts.permissions import IsAdminOrStaff
 from support.models import Notification
+from records.models import Prescription
 from accounts.models import User
+from clinic_backend.pagination import AppointmentCursorPagination
+from clinic_backend.conditional import ConditionalGetMixin, related_rows
+from clinic_backend.serializers import OptimizedQuerysetMixin
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
+    # Only role and profile ids are read here, so signed token claims suffice
+    stateless_auth_actions = ('list', 'retrieve', 'upcoming', 'calendar')
+    etag_timestamp_fields = ('updated_at', 'patient__updated_at', 'patient__user__updated_at',
+                             'doctor__updated_at', 'doctor__user__updated_at', 'doctor__department__updated_at',
+                             'billing__updated_at', *related_rows(Prescription, 'appointment'))
+    pagination_class = AppointmentCursorPagination
+    pagination_count_mode = 'estimate'
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'upcoming']:
+        if self.action in ['list', 'retrieve', 'upcoming', 'calendar']:
             return [IsAuthenticated()]
         if self.action == 'create':
             # Allow Patients and Admin/Staff to book appointments
@@ -225,4 +239,41 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             status__in=['PENDING', 'APPROVED']
         ).select_related('patient__user', 'doctor__user')
         serializer = self.get_serializer(appointments, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Appointments grouped by day with the doctors' slot windows, for
+        ?doctor_id= or ?department_id= (doctors always get their own) from
+        ?start= (today) to ?end= (a week). ?status= takes a comma list.
+        """
+        user = request.user
+        if user.role not in ['DOCTOR', 'ADMIN', 'STAFF']:
+            return Response({'error': 'Only doctors and staff can view calendars'}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        try:
+            start = parse_date(params.get('start') or '') or timezone.localdate()
+            end = parse_date(params.get('end') or '') or start + timedelta(days=6)
+        except ValueError:
+            # Well-formed but impossible dates, e.g. 2026-02-30
+            return Response({'error': 'start and end must be valid YYYY-MM-DD dates'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if end < start or (end - start).days >= MAX_DAYS:
+            return Response({'error': f'end must be on or after start and at most {MAX_DAYS} days later'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        statuses = [value for value in params.get('status', '').upper().split(',') if value] or DEFAULT_STATUSES
+        valid = {code for code, _ in Appointment.STATUS_CHOICES}
+        if not set(statuses) <= valid:
+            return Response({'error': f"status must be among {', '.join(sorted(valid))}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if user.role == 'DOCTOR':
+            # Same rule as the appointment list: doctors only see accepted bookings
+            statuses = [value for value in statuses if value in ('APPROVED', 'VISITED')]
+
+        doctors, error = calendar_doctors(user, params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(doctor_calendar(doctors, start, end, statuses))
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AutocompleteConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'autocomplete'
+
+    def ready(self):
+        import autocomplete.signals  # noqa
@@ -0,0 +1,220 @@
+# autocomplete/index.py
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections
+
+from patients.search import normalize, words
+
+DOCTOR, DEPARTMENT, PATIENT = 'doctor', 'department', 'patient'
+TYPES = (DOCTOR, DEPARTMENT, PATIENT)
+
+
+class PrefixIndex:
+    """
+    In-memory type-ahead index over sorted arrays.
+
+    Every entry is reachable by several normalized keys (each name word,
+    specialization, department, UHID...). `_keys` holds sorted
+    (key, type, id) tuples, so all keys sharing a prefix form one contiguous
+    run found by bisection. Updates insert/remove individual tuples, which
+    keeps incremental refreshes from model signals cheap.
+
+    A full rebuild loads entries while the old index keeps serving. Updates
+    arriving meanwhile are journaled from begin_rebuild() and replayed onto
+    the new entries in replace(), so none are lost by the swap.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._journal = None
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def begin_rebuild(self):
+        with self._lock:
+            self._journal = []
+
+    def cancel_rebuild(self):
+        with self._lock:
+            self._journal = None
+
+    def replace(self, entries):
+        """Swap in a complete set of entries: {(type, id): (payload, keys)}"""
+        with self._lock:
+            replayed = list(self._journal or ())
+        for kind, pk, entry in replayed:
+            self._apply(entries, kind, pk, entry)
+        keys = sorted((key, kind, pk) for (kind, pk), (_, entry_keys) in entries.items() for key in entry_keys)
+        with self._lock:
+            # Updates that raced the sort go in the slow way, one tuple at a time
+            late = (self._journal or [])[len(replayed):]
+            self._entries, self._keys, self._journal = entries, keys, None
+            for kind, pk, entry in late:
+                if entry is None:
+                    self.remove(kind, pk)
+                else:
+                    self.upsert(kind, pk, *entry)
+            self.built_at = time.monotonic()
+
+    @staticmethod
+    def _apply(entries, kind, pk, entry):
+        if entry is None:
+            entries.pop((kind, pk), None)
+        else:
+            entries[(kind, pk)] = entry
+
+    def upsert(self, kind, pk, payload, keys):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((kind, pk, (payload, keys)))
+            self._remove_keys(kind, pk)
+            self._entries[(kind, pk)] = (payload, keys)
+            for key in keys:
+                insort(self._keys, (key, kind, pk))
+
+    def remove(self, kind, pk):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((kind, pk, None))
+            self._remove_keys(kind, pk)
+            self._entries.pop((kind, pk), None)
+
+    def _remove_keys(self, kind, pk):
+        existing = self._entries.get((kind, pk))
+        if existing is None:
+            return
+        for key in existing[1]:
+            position = bisect_left(self._keys, (key, kind, pk))
+            if position < len(self._keys) and self._keys[position] == (key, kind, pk):
+                del self._keys[position]
+
+    def search(self, query, types=TYPES, limit=10, scan_limit=2000):
+        """
+        Entries whose keys start with every word of `query`, best first.
+
+        Candidates come from the run of the first word; later words must
+        prefix one of the candidate's keys. Matches on an entry's first key
+        (its leading name word) outrank matches further in, then shorter
+        labels win, then alphabetical order.
+        """
+        terms = words(query)
+        if not terms:
+            return []
+        first, rest = terms[0], terms[1:]
+
+        matches = {}
+        # upsert()/remove() shift _keys in place; the scan is bounded, so hold the lock for it
+        with self._lock:
+            keys, entries = self._keys, self._entries
+            position = bisect_left(keys, (first,))
+            scanned = 0
+            while position < len(keys) and scanned < scan_limit:
+                key, kind, pk = keys[position]
+                if not key.startswith(first):
+                    break
+                position += 1
+                scanned += 1
+                if kind not in types or (kind, pk) in matches:
+                    continue
+                entry = entries.get((kind, pk))
+                if entry is None:
+                    continue
+                payload, entry_keys = entry
+                if all(any(k.startswith(term) for k in entry_keys) for term in rest):
+                    rank = 0 if entry_keys and entry_keys[0].startswith(first) else 1
+                    matches[(kind, pk)] = (rank, len(payload['label']), payload['label'], payload)
+
+        ranked = sorted(matches.values(), key=lambda match: match[:3])
+        return [payload for *_, payload in ranked[:limit]]
+
+    def is_stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > settings.AUTOCOMPLETE_MAX_AGE
+
+
+def _unique(keys):
+    return tuple(dict.fromkeys(key for key in keys if key))
+
+
+def doctor_entry(doctor):
+    user = doctor.user
+    department = doctor.department.name if doctor.department else ''
+    payload = {
+        'type': DOCTOR,
+        'id': doctor.id,
+        'label': f'Dr. {user.first_name} {user.last_name}'.strip(),
+        'detail': ' · '.join(part for part in (doctor.specialization, department) if part),
+        'is_available': doctor.is_available,
+    }
+    keys = _unique(words(user.first_name) + words(user.last_name)
+                   + words(doctor.specialization) + words(department))
+    return payload, keys
+
+
+def department_entry(department):
+    payload = {'type': DEPARTMENT, 'id': department.id, 'label': department.name, 'detail': ''}
+    return payload, _unique(words(department.name))
+
+
+def patient_entry(patient):
+    user = patient.user
+    payload = {
+        'type': PATIENT,
+        'id': patient.id,
+        'label': f'{user.first_name} {user.last_name}'.strip(),
+        'detail': patient.uhid or '',
+    }
+    uhid_keys = []
+    if patient.uhid:
+        sequence = patient.uhid.rsplit('-', 1)[-1]
+        uhid_keys = [normalize(patient.uhid), sequence, sequence.lstrip('0')]
+    return payload, _unique(words(user.first_name) + words(user.last_name) + uhid_keys)
+
+
+def build_entries():
+    from doctors.models import Department, Doctor
+    from patients.models import Patient
+
+    entries = {}
+    for doctor in Doctor.objects.select_related('user', 'department'):
+        entries[(DOCTOR, doctor.id)] = doctor_entry(doctor)
+    for department in Department.objects.all():
+        entries[(DEPARTMENT, department.id)] = department_entry(department)
+    for patient in Patient.objects.select_related('user').filter(user__role='PATIENT').iterator(chunk_size=5000):
+        entries[(PATIENT, patient.id)] = patient_entry(patient)
+    return entries
+
+
+index = PrefixIndex()
+_build_lock = threading.Lock()
+
+
+def _rebuild():
+    try:
+        index.begin_rebuild()
+        index.replace(build_entries())
+    except Exception:
+        index.cancel_rebuild()
+        raise
+    finally:
+        _build_lock.release()
+        connections.close_all()
+
+
+def get_index():
+    """
+    The process-wide index. The first call builds it from the database;
+    once it is older than AUTOCOMPLETE_MAX_AGE one background thread
+    rebuilds it while requests keep searching the current one.
+    """
+    if index.built_at is None:
+        with _build_lock:
+            if index.built_at is None:
+                index.replace(build_entries())
+    elif index.is_stale() and _build_lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild, name='autocomplete-rebuild', daemon=True).start()
+    return index
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import User
+from doctors.models import Department, Doctor
+from patients.models import Patient
+from .index import DEPARTMENT, DOCTOR, PATIENT, department_entry, doctor_entry, index, patient_entry
+
+
+def _index_built():
+    # Nothing to patch until the first query builds the index from the database
+    return index.built_at is not None
+
+
+@receiver(post_save, sender=Doctor)
+def index_doctor(sender, instance, **kwargs):
+    if _index_built():
+        index.upsert(DOCTOR, instance.pk, *doctor_entry(instance))
+
+
+@receiver(post_save, sender=Department)
+def index_department(sender, instance, **kwargs):
+    if _index_built():
+        index.upsert(DEPARTMENT, instance.pk, *department_entry(instance))
+        # Doctor entries show and match on their department's name
+        for doctor in instance.doctors.select_related('user', 'department'):
+            index.upsert(DOCTOR, doctor.pk, *doctor_entry(doctor))
+
+
+@receiver(post_save, sender=Patient)
+def index_patient(sender, instance, **kwargs):
+    if _index_built() and instance.user.role == 'PATIENT':
+        index.upsert(PATIENT, instance.pk, *patient_entry(instance))
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, created, **kwargs):
+    """Names live on the user row; new users are indexed with their profile instead"""
+    if created or not _index_built():
+        return
+    if instance.role == 'DOCTOR':
+        doctor = Doctor.objects.select_related('department').filter(user=instance).first()
+        if doctor is not None:
+            doctor.user = instance
+            index.upsert(DOCTOR, doctor.pk, *doctor_entry(doctor))
+    elif instance.role == 'PATIENT':
+        patient = Patient.objects.filter(user=instance).first()
+        if patient is not None:
+            patient.user = instance
+            index.upsert(PATIENT, patient.pk, *patient_entry(patient))
+
+
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=Patient)
+def unindex(sender, instance, **kwargs):
+    kind = {Doctor: DOCTOR, Department: DEPARTMENT, Patient: PATIENT}[sender]
+    index.remove(kind, instance.pk)
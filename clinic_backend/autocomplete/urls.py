@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import AutocompleteView
+
+urlpatterns = [
+    path('', AutocompleteView.as_view(), name='autocomplete'),
+]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .index import DEPARTMENT, DOCTOR, PATIENT, TYPES, get_index
+
+
+class AutocompleteView(APIView):
+    """
+    Type-ahead suggestions served from the in-memory prefix index.
+
+    GET /api/autocomplete/?q=rav&types=doctor,department&limit=10
+    Patients are only suggested to admin and staff users.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        allowed = (DOCTOR, DEPARTMENT, PATIENT) if request.user.role in ['ADMIN', 'STAFF'] else (DOCTOR, DEPARTMENT)
+
+        requested = request.query_params.get('types')
+        if requested:
+            types = tuple(kind for kind in requested.split(',') if kind in TYPES and kind in allowed)
+        else:
+            types = allowed
+
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), settings.AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=400)
+
+        results = get_index().search(query, types=types, limit=max(limit, 1)) if types else []
+        return Response({'results': results})
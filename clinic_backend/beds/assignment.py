@@ -0,0 +1,192 @@
+# beds/assignment.py
+
+import heapq
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from clinic_backend.cache import invalidate_model_responses
+from support.models import Notification
+from .events import beds_changed
+from .models import Bed, BedAllocation, BedRequest, Ward
+
+# Without an explicit preference, requests get a general bed on a general
+# inpatient ward; critical-care capacity is only handed out when asked for
+GENERAL_BED_TYPES = ('STANDARD', 'ADJUSTABLE')
+RESTRICTED_WARD_TYPES = ('ICU', 'EMERGENCY')
+PEDIATRIC_AGE_LIMIT = 14
+
+
+def _age(date_of_birth, today):
+    return today.year - date_of_birth.year - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
+
+
+class WardAvailability:
+    """Available beds of one ward as a min-heap per bed type: (price, bed number, bed id)"""
+
+    def __init__(self, ward):
+        self.ward = ward
+        self.beds = defaultdict(list)
+        self.count = 0
+
+    def add(self, bed):
+        heapq.heappush(self.beds[bed.bed_type], (bed.price_per_day, bed.bed_number, bed.id))
+        self.count += 1
+
+    def cheapest(self, bed_types):
+        """(price, bed number, bed id, bed type) of the cheapest bed of any of `bed_types`"""
+        best = None
+        for bed_type in bed_types:
+            heap = self.beds.get(bed_type)
+            if heap and (best is None or heap[0] < best[:3]):
+                best = heap[0] + (bed_type,)
+        return best
+
+    def take(self, bed_type):
+        self.count -= 1
+        return heapq.heappop(self.beds[bed_type])
+
+
+class Availability:
+    """
+    In-memory view of every available bed, grouped by ward type then ward,
+    so each request only looks at the heads of the wards it may go to.
+    """
+
+    def __init__(self, beds):
+        self.wards = {}
+        self.by_ward_type = defaultdict(list)
+        for bed in beds:
+            ward = self.wards.get(bed.ward_id)
+            if ward is None:
+                ward = self.wards[bed.ward_id] = WardAvailability(bed.ward)
+                self.by_ward_type[bed.ward.ward_type].append(ward)
+            ward.add(bed)
+
+    def __len__(self):
+        return sum(ward.count for ward in self.wards.values())
+
+    def assign(self, ward_types, bed_types, max_price=None):
+        """
+        Remove and return (ward, bed id, bed type) for the cheapest bed that
+        fits, preferring the emptier ward on equal price; None if nothing fits.
+        """
+        best = None
+        for ward_type in ward_types:
+            for ward in self.by_ward_type.get(ward_type, ()):
+                candidate = ward.cheapest(bed_types)
+                if candidate is None or (max_price is not None and candidate[0] > max_price):
+                    continue
+                key = (candidate[0], -ward.count, ward.ward.id)
+                if best is None or key < best[0]:
+                    best = (key, ward, candidate[3])
+        if best is None:
+            return None
+        _, ward, bed_type = best
+        _, _, bed_id = ward.take(bed_type)
+        return ward.ward, bed_id, bed_type
+
+
+def placement_options(bed_request, today=None):
+    """
+    [(ward types, bed types), ...] a request may be placed in, most preferred
+    first, from its own preferences and the patient's age and gender
+    """
+    patient = bed_request.patient
+    is_child = _age(patient.date_of_birth, today or date.today()) < PEDIATRIC_AGE_LIMIT
+
+    if bed_request.preferred_ward_type:
+        ward_types = [bed_request.preferred_ward_type]
+    else:
+        ward_types = [ward_type for ward_type, _ in Ward.WARD_TYPES if ward_type not in RESTRICTED_WARD_TYPES]
+    if not is_child:
+        ward_types = [ward_type for ward_type in ward_types if ward_type != 'PEDIATRIC']
+    if patient.gender != 'F':
+        ward_types = [ward_type for ward_type in ward_types if ward_type != 'MATERNITY']
+
+    if bed_request.preferred_bed_type:
+        bed_types = [bed_request.preferred_bed_type]
+    else:
+        bed_types = list(GENERAL_BED_TYPES) + (['PEDIATRIC'] if is_child else [])
+
+    if is_child and 'PEDIATRIC' in ward_types and len(ward_types) > 1:
+        # Children go to the paediatric ward while it has room
+        return [(['PEDIATRIC'], bed_types), ([t for t in ward_types if t != 'PEDIATRIC'], bed_types)]
+    return [(ward_types, bed_types)]
+
+
+def assign_pending_requests(limit=None, dry_run=False):
+    """
+    Match PENDING bed requests, oldest first, to AVAILABLE beds in a single
+    transaction. Pending requests and available beds are locked and read
+    once, placement runs against the in-memory Availability, and the
+    results are written back in bulk. Requests that cannot be placed stay
+    PENDING. Returns (assigned, unassigned) lists of dicts.
+    """
+    today = timezone.localdate()
+    with transaction.atomic():
+        requests = (BedRequest.objects.select_for_update(skip_locked=True, of=('self',))
+                    .filter(status='PENDING', allocation__isnull=True)
+                    .select_related('patient__user')
+                    .order_by('created_at', 'id'))
+        if limit:
+            requests = requests[:limit]
+        requests = list(requests)
+        beds = list(Bed.objects.select_for_update(of=('self',))
+                    .filter(status='AVAILABLE', is_active=True)
+                    .select_related('ward')
+                    .order_by('id'))
+        admitted = set(BedAllocation.objects
+                       .filter(status='ACTIVE', patient_id__in={r.patient_id for r in requests})
+                       .values_list('patient_id', flat=True))
+
+        availability = Availability(beds)
+        allocations, notifications, assigned, unassigned = [], [], [], []
+        for bed_request in requests:
+            summary = {
+                'request': bed_request.id,
+                'patient': bed_request.patient_id,
+                'patient_name': bed_request.patient.user.full_name,
+            }
+            if bed_request.patient_id in admitted:
+                unassigned.append({**summary, 'reason': 'Patient is already admitted'})
+                continue
+            placement = None
+            for ward_types, bed_types in placement_options(bed_request, today):
+                placement = availability.assign(ward_types, bed_types, bed_request.max_price_per_day)
+                if placement is not None:
+                    break
+            if placement is None:
+                unassigned.append({**summary, 'reason': 'No matching bed available'})
+                continue
+            ward, bed_id, bed_type = placement
+            admitted.add(bed_request.patient_id)
+            allocations.append(BedAllocation(
+                bed_id=bed_id,
+                patient_id=bed_request.patient_id,
+                bed_request=bed_request,
+                reason=f'Bed request #{bed_request.id}',
+                status='ACTIVE',
+            ))
+            assigned.append({**summary, 'bed': bed_id, 'bed_type': bed_type,
+                             'ward': ward.id, 'ward_name': ward.name})
+            notifications.append(Notification(
+                user=bed_request.patient.user,
+                title='Bed Assigned',
+                message=f'A bed has been assigned to you in {ward.name}.',
+            ))
+
+        if allocations and not dry_run:
+            # bulk_create and update skip model signals, so beds are marked occupied and
+            # published to the bed board here
+            BedAllocation.objects.bulk_create(allocations)
+            Bed.objects.filter(id__in=[allocation.bed_id for allocation in allocations]).update(status='OCCUPIED')
+            BedRequest.objects.filter(id__in=[allocation.bed_request.id for allocation in allocations]).update(
+                status='APPROVED', updated_at=timezone.now()
+            )
+            Notification.objects.bulk_create(notifications)
+            transaction.on_commit(lambda: invalidate_model_responses(Bed))
+            beds_changed(allocation.bed_id for allocation in allocations)
+    return assigned, unassigned
@@ -0,0 +1,126 @@
+# beds/census.py
+
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from clinic_backend.cache import invalidate_model_responses
+from .models import Bed, BedAllocation, BedCensus, Ward
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _local_date(value):
+    return timezone.localtime(value).date()
+
+
+def _replace_days(start, end, rows, batch_size=2000):
+    with transaction.atomic():
+        BedCensus.objects.filter(date__gte=start, date__lte=end).delete()
+        BedCensus.objects.bulk_create(rows, batch_size=batch_size)
+        # Bulk writes skip model signals
+        transaction.on_commit(lambda: invalidate_model_responses(BedCensus))
+
+
+def take_census(census_date=None):
+    """
+    Snapshot the live bed state as the census of `census_date` (yesterday by
+    default, for a job run just after midnight). Admissions and discharges
+    are counted from that day's allocations. Returns the rows written.
+    """
+    census_date = census_date or timezone.localdate() - timedelta(days=1)
+    day_start, day_end = _day_bounds(census_date)
+
+    rows = {}
+    beds = (Bed.objects.filter(is_active=True)
+            .values('ward_id', 'ward__ward_type', 'bed_type')
+            .annotate(total=Count('id'), occupied=Count('id', filter=Q(status='OCCUPIED'))))
+    for bed in beds:
+        rows[(bed['ward_id'], bed['bed_type'])] = BedCensus(
+            date=census_date, ward_id=bed['ward_id'], ward_type=bed['ward__ward_type'], bed_type=bed['bed_type'],
+            total_beds=bed['total'], occupied_beds=bed['occupied'],
+        )
+
+    movements = (
+        ('admissions', Q(admission_date__gte=day_start, admission_date__lt=day_end)),
+        ('discharges', Q(discharge_date__gte=day_start, discharge_date__lt=day_end)),
+    )
+    for field, window in movements:
+        counts = (BedAllocation.objects.filter(window)
+                  .values('bed__ward_id', 'bed__ward__ward_type', 'bed__bed_type')
+                  .annotate(n=Count('id')))
+        for count in counts:
+            key = (count['bed__ward_id'], count['bed__bed_type'])
+            if key not in rows:
+                # Only inactive beds of this kind are left
+                rows[key] = BedCensus(date=census_date, ward_id=key[0], ward_type=count['bed__ward__ward_type'],
+                                      bed_type=key[1])
+            setattr(rows[key], field, count['n'])
+
+    _replace_days(census_date, census_date, list(rows.values()))
+    return len(rows)
+
+
+def backfill_census(start=None, end=None):
+    """
+    Rebuild the census of every day from `start` to `end` (earliest admission
+    to yesterday by default) from allocation intervals, in one pass.
+
+    An allocation occupies its bed at the midnights from its admission day
+    up to, but not including, its discharge day. Each allocation therefore
+    adds +1 on its admission day and -1 on its discharge day, and a running
+    sum over the days gives the occupancy of every day. Bed totals use the
+    current inventory, and transferred stays count against their current
+    bed, since neither has history of its own. Returns the rows written.
+    """
+    beds = {bed['id']: (bed['ward_id'], bed['bed_type'], bed['is_active'])
+            for bed in Bed.objects.values('id', 'ward_id', 'bed_type', 'is_active')}
+    ward_types = dict(Ward.objects.values_list('id', 'ward_type'))
+    totals = Counter((ward_id, bed_type) for ward_id, bed_type, is_active in beds.values() if is_active)
+
+    changes = defaultdict(Counter)
+    admissions = defaultdict(Counter)
+    discharges = defaultdict(Counter)
+    first_day = None
+    allocations = BedAllocation.objects.values_list('bed_id', 'admission_date', 'discharge_date')
+    for bed_id, admitted_at, discharged_at in allocations.iterator(chunk_size=5000):
+        ward_id, bed_type, _ = beds[bed_id]
+        key = (ward_id, bed_type)
+        admitted = _local_date(admitted_at)
+        changes[key][admitted] += 1
+        admissions[key][admitted] += 1
+        if discharged_at is not None:
+            discharged = _local_date(discharged_at)
+            changes[key][discharged] -= 1
+            discharges[key][discharged] += 1
+        first_day = admitted if first_day is None else min(first_day, admitted)
+
+    end = end or timezone.localdate() - timedelta(days=1)
+    start = start or first_day or end
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+    rows = []
+    for key in set(totals) | set(changes):
+        ward_id, bed_type = key
+        key_changes = changes[key]
+        # Stays that began before `start` are carried in
+        occupied = sum(delta for day, delta in key_changes.items() if day < start)
+        for day in days:
+            occupied += key_changes.get(day, 0)
+            admitted, discharged = admissions[key].get(day, 0), discharges[key].get(day, 0)
+            if not (totals[key] or occupied or admitted or discharged):
+                continue
+            rows.append(BedCensus(
+                date=day, ward_id=ward_id, ward_type=ward_types[ward_id], bed_type=bed_type,
+                total_beds=totals[key], occupied_beds=max(occupied, 0),
+                admissions=admitted, discharges=discharged,
+            ))
+
+    _replace_days(start, end, rows)
+    return len(rows)
@@ -0,0 +1,195 @@
+# beds/events.py
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .models import Bed, BedAllocation
+
+
+class EventBus:
+    """
+    In-process ring buffer of numbered events.
+
+    Publishers append (sequence, payload) under a condition variable and
+    wake every waiting stream; each stream remembers the last sequence it
+    sent and asks for what came after it. Only the newest `size` events are
+    kept, so a client resuming from an older sequence is told it missed
+    some and has to start over from a snapshot.
+    """
+
+    def __init__(self, size):
+        self._events = deque(maxlen=size)
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    def publish(self, payloads):
+        with self._condition:
+            for payload in payloads:
+                self._sequence += 1
+                self._events.append((self._sequence, payload))
+            self._condition.notify_all()
+
+    def since(self, sequence):
+        """(events after `sequence`, whether none were lost to the buffer limit)"""
+        with self._condition:
+            if not self._events:
+                return [], sequence == self._sequence
+            oldest = self._events[0][0]
+            if sequence < oldest - 1 or sequence > self._sequence:
+                return [], False
+            return list(islice(self._events, sequence - oldest + 1, None)), True
+
+    def wait(self, sequence, timeout):
+        """Block up to `timeout` seconds for events after `sequence`"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence > sequence, timeout)
+        return self.since(sequence)
+
+
+bus = EventBus(settings.BED_BOARD_BUFFER_SIZE)
+# Every open stream holds a request thread for up to BED_BOARD_STREAM_SECONDS
+_stream_slots = threading.BoundedSemaphore(settings.BED_BOARD_MAX_STREAMS)
+# Sequences only mean something to the process that numbered them
+BOOT_ID = uuid.uuid4().hex[:12]
+
+
+def event_id(sequence):
+    return f'{BOOT_ID}-{sequence}'
+
+
+def parse_event_id(value):
+    """
+    Sequence of a Last-Event-ID this process issued, or None for anything
+    else (another worker, a restart, garbage), which calls for a snapshot
+    """
+    boot_id, _, sequence = (value or '').partition('-')
+    if boot_id != BOOT_ID or not sequence.isdigit():
+        return None
+    return int(sequence)
+
+
+def bed_states(bed_ids=None):
+    """Compact board rows: {id, ward, bed_number, status, is_active, allocation, patient}"""
+    beds = Bed.objects.order_by('id')
+    allocations = BedAllocation.objects.filter(status='ACTIVE')
+    if bed_ids is not None:
+        beds = beds.filter(id__in=bed_ids)
+        allocations = allocations.filter(bed_id__in=bed_ids)
+    active = {bed_id: (allocation_id, patient_id)
+              for allocation_id, bed_id, patient_id in allocations.values_list('id', 'bed_id', 'patient_id')}
+    return [
+        {'id': bed_id, 'ward': ward_id, 'bed_number': bed_number, 'status': status, 'is_active': is_active,
+         'allocation': active.get(bed_id, (None, None))[0], 'patient': active.get(bed_id, (None, None))[1]}
+        for bed_id, ward_id, bed_number, status, is_active
+        in beds.values_list('id', 'ward_id', 'bed_number', 'status', 'is_active')
+    ]
+
+
+def _publish(bed_ids):
+    found = bed_states(bed_ids)
+    missing = set(bed_ids) - {state['id'] for state in found}
+    bus.publish(found + [{'id': bed_id, 'deleted': True} for bed_id in sorted(missing)])
+
+
+def beds_changed(bed_ids):
+    """
+    Publish the current state of `bed_ids` once the surrounding transaction
+    commits. Model saves call this from signals; code that changes beds with
+    queryset updates or bulk_create calls it directly.
+    """
+    bed_ids = list(bed_ids)
+    if bed_ids:
+        transaction.on_commit(lambda: _publish(bed_ids))
+
+
+def _message(sequence, event, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {event_id(sequence)}\nevent: {event}\ndata: {payload}\n\n'
+
+
+def _snapshot(ward_id):
+    sequence = bus.sequence
+    # Changes racing the read are sent again afterwards; every event is a full bed row
+    states = [state for state in bed_states() if ward_id is None or state['ward'] == ward_id]
+    # Nothing else here touches the database; don't hold a connection for the whole stream
+    connection.close()
+    return sequence, _message(sequence, 'snapshot', states)
+
+
+def stream(since=None, ward_id=None, duration=None, heartbeat=None):
+    """
+    Server-sent events for the bed board: a 'snapshot' of every bed (unless
+    resuming from sequence `since` of this process with nothing missed; see
+    parse_event_id), then one 'bed' event per
+    change. Comment lines keep idle connections alive, and the stream ends
+    after `duration` seconds; EventSource reconnects with Last-Event-ID.
+    """
+    duration = duration or settings.BED_BOARD_STREAM_SECONDS
+    heartbeat = heartbeat or settings.BED_BOARD_HEARTBEAT_SECONDS
+    deadline = time.monotonic() + duration
+    yield 'retry: 3000\n\n'
+
+    events, complete = bus.since(since) if since is not None else ([], False)
+    if complete:
+        sequence = since
+    else:
+        sequence, message = _snapshot(ward_id)
+        yield message
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if events:
+            for event_sequence, payload in events:
+                if ward_id is None or payload.get('ward', ward_id) == ward_id:
+                    yield _message(event_sequence, 'bed', payload)
+            sequence = events[-1][0]
+        else:
+            yield ': keepalive\n\n'
+        events, complete = bus.wait(sequence, min(heartbeat, remaining))
+        if not complete:
+            # Fell behind the buffer (or the process restarted): start over
+            sequence, message = _snapshot(ward_id)
+            yield message
+            events = []
+
+
+class _Stream:
+    """Iterates a stream() and gives its slot back however the response ends"""
+
+    def __init__(self, events):
+        self._events = events
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        # A generator closed before it started never runs its cleanup, so release here
+        self._events.close()
+        if not self._released:
+            self._released = True
+            _stream_slots.release()
+
+
+def open_stream(since=None, ward_id=None):
+    """stream() holding one of this process's BED_BOARD_MAX_STREAMS slots, or None when all are taken"""
+    if not _stream_slots.acquire(blocking=False):
+        return None
+    return _Stream(stream(since, ward_id))
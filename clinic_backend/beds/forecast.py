@@ -0,0 +1,196 @@
+# beds/forecast.py
+
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .assignment import placement_options
+from .models import Bed, BedAllocation, BedRequest
+
+MAX_DAYS = 90
+MAX_SIMULATIONS = 5000
+HISTORY_DAYS = 365
+# Below this many finished stays a ward type borrows the hospital-wide history
+MIN_HISTORY = 30
+DEFAULT_STAY_DAYS = 3.0
+SECONDS_PER_DAY = 86400.0
+# Reading a year of stays dominates a forecast, and it barely moves within an hour
+STAY_MODEL_CACHE_KEY = 'beds:forecast:stay-model'
+STAY_MODEL_TTL = 60 * 60
+
+
+class StayModel:
+    """
+    Length-of-stay distribution learned from finished allocations: sorted
+    stays (days) per ward type, plus actual/expected ratios of stays that
+    came from a bed request with expected_bed_days.
+    """
+
+    def __init__(self, stays, ratios):
+        everything = np.sort(np.concatenate(list(stays.values()))) if stays else np.array([])
+        self.pooled = everything
+        self.stays = {ward_type: np.sort(values) for ward_type, values in stays.items() if len(values) >= MIN_HISTORY}
+        self.ratios = np.sort(ratios) if len(ratios) >= MIN_HISTORY else None
+
+    @classmethod
+    def learn(cls, since):
+        stays = defaultdict(list)
+        ratios = []
+        history = (BedAllocation.objects
+                   .filter(status='DISCHARGED', discharge_date__isnull=False, discharge_date__gte=since)
+                   .values_list('bed__ward__ward_type', 'admission_date', 'discharge_date',
+                                'bed_request__expected_bed_days'))
+        for ward_type, admitted, discharged, expected in history.iterator(chunk_size=5000):
+            days = max((discharged - admitted).total_seconds() / SECONDS_PER_DAY, 0.0)
+            stays[ward_type].append(days)
+            if expected:
+                ratios.append(days / expected)
+        return cls({ward_type: np.array(values) for ward_type, values in stays.items()}, np.array(ratios))
+
+    @classmethod
+    def cached(cls):
+        return cache.get_or_set(
+            STAY_MODEL_CACHE_KEY,
+            lambda: cls.learn(timezone.now() - timedelta(days=HISTORY_DAYS)),
+            STAY_MODEL_TTL,
+        )
+
+    def for_ward_type(self, ward_type):
+        stays = self.stays.get(ward_type)
+        if stays is None and len(self.pooled) >= MIN_HISTORY:
+            stays = self.pooled
+        return stays
+
+    def typical_remaining(self, ward_type, elapsed):
+        """Median remaining stay of patients who have been in for `elapsed` days (deterministic forecast)"""
+        stays = self.for_ward_type(ward_type)
+        if stays is None:
+            return np.maximum(DEFAULT_STAY_DAYS - elapsed, 0.5)
+        start = np.searchsorted(stays, elapsed, side='right')
+        middle = np.minimum((start + len(stays)) // 2, len(stays) - 1)
+        # Stays longer than anything on record end within half a day
+        return np.where(start < len(stays), stays[middle] - elapsed, 0.5)
+
+    def sample_remaining(self, ward_type, elapsed, simulations, rng):
+        """
+        (patients, simulations) remaining stays for patients in for `elapsed`
+        days, drawn from the recorded stays longer than `elapsed`
+        """
+        stays = self.for_ward_type(ward_type)
+        if stays is None:
+            return np.repeat(self.typical_remaining(ward_type, elapsed)[:, None], simulations, axis=1)
+        start = np.searchsorted(stays, elapsed, side='right')
+        available = len(stays) - start
+        picks = start[:, None] + (rng.random((len(elapsed), simulations)) * available[:, None]).astype(int)
+        picks = np.minimum(picks, len(stays) - 1)
+        remaining = stays[picks] - elapsed[:, None]
+        return np.where(available[:, None] > 0, remaining, 0.5)
+
+    def sample_expected(self, expected, simulations, rng):
+        """(patients, simulations) stays for stated expected_bed_days, scaled by recorded actual/expected ratios"""
+        if self.ratios is None:
+            return np.repeat(expected[:, None], simulations, axis=1)
+        picks = (rng.random((len(expected), simulations)) * len(self.ratios)).astype(int)
+        return expected[:, None] * self.ratios[picks]
+
+
+def _occupancy(remaining, days):
+    """
+    Beds still occupied after each of days 1..days for remaining stays of
+    shape (patients, simulations), as (days, simulations): a bincount of
+    discharge days per simulation and a reversed cumulative sum, so the
+    whole simulation is a handful of array passes.
+    """
+    patients, simulations = remaining.shape
+    if patients == 0:
+        return np.zeros((days, simulations), dtype=int)
+    discharge_day = np.clip(np.ceil(remaining).astype(int), 0, days + 1)
+    flat = (np.arange(simulations)[None, :] * (days + 2) + discharge_day).ravel()
+    counts = np.bincount(flat, minlength=simulations * (days + 2)).reshape(simulations, days + 2)
+    # Occupied after day d = patients discharged on a later day than d
+    still_in = counts[:, ::-1].cumsum(axis=1)[:, ::-1]
+    return still_in[:, 2:days + 2].T if days else np.zeros((0, simulations), dtype=int)
+
+
+def forecast_capacity(days=14, simulations=0, seed=None):
+    """
+    Project free beds per ward type for each of the next `days` days.
+
+    Starts from current active allocations and assumes every pending bed
+    request is admitted today into its first-choice ward type. Patients
+    with a stated expected_bed_days stay that long, others the typical
+    remaining stay for how long they have already been in. With
+    `simulations` > 0 stays are instead drawn from the recorded length of
+    stay of the last year, giving a mean, 10th/90th percentiles and the
+    chance of running out of beds on each day.
+    """
+    now = timezone.now()
+    rng = np.random.default_rng(seed)
+    model = StayModel.cached()
+    monte_carlo = simulations > 0
+    runs = simulations if monte_carlo else 1
+
+    capacity = dict(Bed.objects.filter(is_active=True).exclude(status='MAINTENANCE')
+                    .values_list('ward__ward_type').annotate(n=Count('id')))
+
+    # (elapsed days, expected days or nan) per patient, by ward type
+    current = defaultdict(list)
+    active = (BedAllocation.objects.filter(status='ACTIVE')
+              .values_list('bed__ward__ward_type', 'admission_date', 'bed_request__expected_bed_days'))
+    for ward_type, admitted, expected in active:
+        elapsed = max((now - admitted).total_seconds() / SECONDS_PER_DAY, 0.0)
+        current[ward_type].append((elapsed, expected or np.nan))
+
+    pending = defaultdict(list)
+    today = timezone.localdate()
+    requests = BedRequest.objects.filter(status='PENDING', allocation__isnull=True).select_related('patient')
+    for bed_request in requests:
+        ward_types = placement_options(bed_request, today)[0][0]
+        ward_type = ward_types[0] if ward_types else 'GENERAL'
+        pending[ward_type].append((0.0, float(bed_request.expected_bed_days or np.nan)))
+
+    forecast = []
+    for ward_type in sorted(set(capacity) | set(current) | set(pending)):
+        patients = np.array(current[ward_type] + pending[ward_type], dtype=float).reshape(-1, 2)
+        elapsed, expected = patients[:, 0], patients[:, 1]
+        # Patients already past their expected stay fall back to the history
+        stated = ~np.isnan(expected) & (expected > elapsed)
+
+        remaining = np.empty((len(patients), runs))
+        if monte_carlo:
+            sampled = model.sample_expected(expected[stated], runs, rng) - elapsed[stated, None]
+            remaining[stated] = np.maximum(sampled, 0.5)
+            remaining[~stated] = model.sample_remaining(ward_type, elapsed[~stated], runs, rng)
+        else:
+            remaining[stated, 0] = expected[stated] - elapsed[stated]
+            remaining[~stated, 0] = model.typical_remaining(ward_type, elapsed[~stated])
+
+        beds = capacity.get(ward_type, 0)
+        free = beds - _occupancy(remaining, days)
+        points = []
+        for day in range(days):
+            point = {'date': today + timedelta(days=day + 1)}
+            if monte_carlo:
+                low, high = np.percentile(free[day], [10, 90])
+                point.update({
+                    'free_beds': round(float(free[day].mean()), 1),
+                    'free_beds_p10': float(low),
+                    'free_beds_p90': float(high),
+                    'shortage_probability': round(float((free[day] < 0).mean()), 3),
+                })
+            else:
+                point['free_beds'] = int(free[day, 0])
+            points.append(point)
+
+        forecast.append({
+            'ward_type': ward_type,
+            'total_beds': beds,
+            'occupied_beds': len(current[ward_type]),
+            'pending_requests': len(pending[ward_type]),
+            'days': points,
+        })
+    return forecast
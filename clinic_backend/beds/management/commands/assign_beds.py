@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from beds.assignment import assign_pending_requests
+
+
+class Command(BaseCommand):
+    help = 'Assign available beds to pending bed requests, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Process at most this many requests')
+        parser.add_argument('--dry-run', action='store_true', help='Show the placements without saving them')
+
+    def handle(self, *args, **options):
+        assigned, unassigned = assign_pending_requests(limit=options['limit'], dry_run=options['dry_run'])
+        for placement in assigned:
+            self.stdout.write(f"Request #{placement['request']} ({placement['patient_name']}) -> "
+                              f"{placement['ward_name']}, bed #{placement['bed']} ({placement['bed_type']})")
+        for skipped in unassigned:
+            self.stdout.write(f"Request #{skipped['request']} ({skipped['patient_name']}): {skipped['reason']}")
+        prefix = 'Dry run: ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Assigned {len(assigned)} requests, {len(unassigned)} left pending'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from beds.census import backfill_census
+
+
+class Command(BaseCommand):
+    help = 'Rebuild historical bed census rows from allocation admission and discharge dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day (YYYY-MM-DD), defaults to the earliest admission')
+        parser.add_argument('--end', help='Last day (YYYY-MM-DD), defaults to yesterday')
+
+    def handle(self, *args, **options):
+        days = {}
+        for name in ('start', 'end'):
+            if options[name]:
+                days[name] = parse_date(options[name])
+                if days[name] is None:
+                    raise CommandError(f'Invalid --{name}, expected YYYY-MM-DD')
+        rows = backfill_census(**days)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} census rows'))
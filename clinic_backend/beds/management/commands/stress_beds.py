@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count, Q
+
+from accounts.models import User
+from beds.models import Bed, BedAllocation, HousekeepingTask, Ward
+from beds.operations import (BedConflict, BedOperationError, allocate_bed, claim_housekeeping_task,
+                             complete_housekeeping_task, discharge_allocation, transfer_allocation)
+from patients.models import Patient
+
+
+class Command(BaseCommand):
+    help = ('Hammer allocate/discharge/transfer/clean from parallel threads on a scratch ward '
+            'and check bed invariants')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--operations', type=int, default=2000, help='Total operations across all threads')
+        parser.add_argument('--beds', type=int, default=10, help='Few beds means more contention')
+        parser.add_argument('--patients', type=int, default=30)
+        parser.add_argument('--keep', action='store_true', help='Keep the scratch ward and patients afterwards')
+
+    def handle(self, *args, **options):
+        tag = f'stress-{int(time.time())}'
+        ward = Ward.objects.create(name=tag, ward_type='GENERAL', floor_number='0')
+        beds = Bed.objects.bulk_create(
+            Bed(ward=ward, bed_number=str(i), price_per_day=1000) for i in range(options['beds'])
+        )
+        users = User.objects.bulk_create(
+            User(email=f'{tag}-{i}@example.com', first_name='Stress', last_name=str(i), role='PATIENT')
+            for i in range(options['patients'])
+        )
+        patients = Patient.objects.bulk_create(
+            Patient(user=user, date_of_birth='1990-01-01', gender='O') for user in users
+        )
+        bed_ids = [bed.id for bed in beds]
+        patient_ids = [patient.id for patient in patients]
+
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def active_allocation_id():
+            return (BedAllocation.objects.filter(bed__ward=ward, status='ACTIVE')
+                    .order_by('?').values_list('id', flat=True).first())
+
+        def operate(_):
+            operation = random.choice(('allocate', 'allocate', 'discharge', 'transfer', 'clean'))
+            result = 'ok'
+            try:
+                if operation == 'allocate':
+                    allocate_bed(random.choice(bed_ids), random.choice(patient_ids), reason='stress test')
+                elif operation == 'clean':
+                    task_id = (HousekeepingTask.objects.filter(bed__ward=ward, status='PENDING')
+                               .order_by('?').values_list('id', flat=True).first())
+                    if task_id is None:
+                        result = 'nothing to do'
+                    else:
+                        complete_housekeeping_task(claim_housekeeping_task(None, task_id).id)
+                else:
+                    allocation_id = active_allocation_id()
+                    if allocation_id is None:
+                        result = 'nothing to do'
+                    elif operation == 'discharge':
+                        discharge_allocation(allocation_id)
+                    else:
+                        transfer_allocation(allocation_id, random.choice(bed_ids))
+            except BedConflict:
+                result = 'conflict'
+            except BedOperationError:
+                result = 'rejected'
+            except Exception as e:
+                result = f'error: {type(e).__name__}'
+            finally:
+                connections.close_all()
+            with lock:
+                outcomes[(operation, result)] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            list(pool.map(operate, range(options['operations'])))
+        elapsed = time.perf_counter() - started
+
+        for (operation, result), count in sorted(outcomes.items()):
+            self.stdout.write(f'{operation:>10} {result:<28} {count:>6}')
+        self.stdout.write(f'{options["operations"] / elapsed:.0f} operations/s over {options["threads"]} threads')
+
+        violations = self.check_invariants(ward)
+        for violation in violations:
+            self.stdout.write(self.style.ERROR(violation))
+
+        if not options['keep']:
+            BedAllocation.objects.filter(bed__ward=ward).delete()
+            ward.delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        if violations:
+            self.stdout.write(self.style.ERROR(f'{len(violations)} invariant violations'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No double allocations, bed status or housekeeping mismatches'))
+
+    def check_invariants(self, ward):
+        violations = []
+        beds = Bed.objects.filter(ward=ward).annotate(
+            active=Count('allocations', filter=Q(allocations__status='ACTIVE'), distinct=True),
+            open_tasks=Count('housekeeping_tasks', distinct=True,
+                             filter=Q(housekeeping_tasks__status__in=['PENDING', 'IN_PROGRESS'])),
+        )
+        for bed in beds:
+            if bed.active > 1:
+                violations.append(f'Bed {bed.bed_number} has {bed.active} active allocations')
+            elif (bed.status == 'OCCUPIED') != (bed.active == 1):
+                violations.append(f'Bed {bed.bed_number} is {bed.status} with {bed.active} active allocations')
+            if bed.status == 'CLEANING' and bed.open_tasks != 1:
+                violations.append(f'Bed {bed.bed_number} is CLEANING with {bed.open_tasks} open housekeeping tasks')
+        doubled = (BedAllocation.objects.filter(bed__ward=ward, status='ACTIVE')
+                   .values('patient_id').annotate(n=Count('id')).filter(n__gt=1))
+        for row in doubled:
+            violations.append(f'Patient {row["patient_id"]} holds {row["n"]} beds')
+        return violations
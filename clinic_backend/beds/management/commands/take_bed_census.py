@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from beds.census import take_census
+
+
+class Command(BaseCommand):
+    help = 'Record the nightly bed census from the current bed state (run just after midnight)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Census date (YYYY-MM-DD), defaults to yesterday')
+
+    def handle(self, *args, **options):
+        census_date = None
+        if options['date']:
+            census_date = parse_date(options['date'])
+            if census_date is None:
+                raise CommandError('Invalid --date, expected YYYY-MM-DD')
+        rows = take_census(census_date)
+        self.stdout.write(self.style.SUCCESS(f'Recorded {rows} census rows'))
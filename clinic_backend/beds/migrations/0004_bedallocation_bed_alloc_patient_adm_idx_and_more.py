@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beds', '0003_bedallocation_payment_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bedallocation',
+            index=models.Index(fields=['patient', '-admission_date', '-id'], name='bed_alloc_patient_adm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bedrequest',
+            index=models.Index(fields=['patient', '-created_at', '-id'], name='bed_req_patient_created_idx'),
+        ),
+    ]
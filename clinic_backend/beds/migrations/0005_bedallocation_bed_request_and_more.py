@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beds', '0004_bedallocation_bed_alloc_patient_adm_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bedallocation',
+            name='bed_request',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='allocation', to='beds.bedrequest'),
+        ),
+        migrations.AddField(
+            model_name='bedrequest',
+            name='max_price_per_day',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='bedrequest',
+            name='preferred_bed_type',
+            field=models.CharField(blank=True, choices=[('STANDARD', 'Standard Bed'), ('ADJUSTABLE', 'Adjustable Bed'), ('ICU', 'ICU Bed'), ('VENTILATOR', 'Bed with Ventilator'), ('PEDIATRIC', 'Pediatric Bed')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='bedrequest',
+            name='preferred_ward_type',
+            field=models.CharField(blank=True, choices=[('GENERAL', 'General Ward'), ('ICU', 'Intensive Care Unit'), ('PRIVATE', 'Private Room'), ('SEMI_PRIVATE', 'Semi-Private Room'), ('EMERGENCY', 'Emergency Ward'), ('MATERNITY', 'Maternity Ward'), ('PEDIATRIC', 'Pediatric Ward')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='bed',
+            index=models.Index(fields=['status', 'ward'], name='bed_status_ward_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bedrequest',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='bed_req_status_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beds', '0005_bedallocation_bed_request_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BedCensus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('ward_type', models.CharField(choices=[('GENERAL', 'General Ward'), ('ICU', 'Intensive Care Unit'), ('PRIVATE', 'Private Room'), ('SEMI_PRIVATE', 'Semi-Private Room'), ('EMERGENCY', 'Emergency Ward'), ('MATERNITY', 'Maternity Ward'), ('PEDIATRIC', 'Pediatric Ward')], max_length=20)),
+                ('bed_type', models.CharField(choices=[('STANDARD', 'Standard Bed'), ('ADJUSTABLE', 'Adjustable Bed'), ('ICU', 'ICU Bed'), ('VENTILATOR', 'Bed with Ventilator'), ('PEDIATRIC', 'Pediatric Bed')], max_length=20)),
+                ('total_beds', models.PositiveIntegerField(default=0)),
+                ('occupied_beds', models.PositiveIntegerField(default=0)),
+                ('admissions', models.PositiveIntegerField(default=0)),
+                ('discharges', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('ward', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='census', to='beds.ward')),
+            ],
+            options={
+                'db_table': 'bed_census',
+                'ordering': ['date', 'ward_id', 'bed_type'],
+                'indexes': [models.Index(fields=['ward_type', 'date'], name='census_ward_type_date_idx'), models.Index(fields=['ward', 'date'], name='census_ward_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bedcensus',
+            constraint=models.UniqueConstraint(fields=('date', 'ward', 'bed_type'), name='unique_bed_census_day'),
+        ),
+    ]
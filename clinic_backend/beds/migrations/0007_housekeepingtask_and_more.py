@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def queue_dirty_beds(apps, schema_editor):
+    # Beds already marked for cleaning get a task so they can leave that state
+    Bed = apps.get_model('beds', 'Bed')
+    HousekeepingTask = apps.get_model('beds', 'HousekeepingTask')
+    HousekeepingTask.objects.bulk_create(
+        HousekeepingTask(bed_id=bed_id, priority=0 if ward_type == 'ICU' else 1)
+        for bed_id, ward_type in Bed.objects.filter(status='CLEANING').values_list('id', 'ward__ward_type')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('beds', '0006_bedcensus_bedcensus_unique_bed_census_day'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HousekeepingTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.PositiveSmallIntegerField(default=1)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('DONE', 'Done')], default='PENDING', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('allocation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='housekeeping_tasks', to='beds.bedallocation')),
+                ('bed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='housekeeping_tasks', to='beds.bed')),
+                ('claimed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='housekeeping_tasks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'housekeeping_tasks',
+                'ordering': ['priority', 'created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'priority', 'created_at', 'id'], name='housekeeping_queue_idx'), models.Index(fields=['completed_at'], name='housekeeping_completed_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='housekeepingtask',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'IN_PROGRESS'])), fields=('bed',), name='one_open_housekeeping_task_per_bed'),
+        ),
+        migrations.RunPython(queue_dirty_beds, migrations.RunPython.noop),
+    ]
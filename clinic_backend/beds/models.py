@@ -60,6 +60,9 @@ class Bed(models.Model):
 
     class Meta:
         unique_together = ['ward', 'bed_number']
+        indexes = [
+            models.Index(fields=['status', 'ward'], name='bed_status_ward_idx'),
+        ]
 
     def __str__(self):
         return f"{self.ward.name} - {self.bed_number}"
@@ -83,20 +86,19 @@ class BedAllocation(models.Model):
     status = models.CharField(max_length=20, choices=ALLOCATION_STATUS, default='ACTIVE')
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS, default='PENDING')
     notes = models.TextField(blank=True)
+    bed_request = models.OneToOneField('BedRequest', on_delete=models.SET_NULL, null=True, blank=True,
+                                       related_name='allocation')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', '-admission_date', '-id'], name='bed_alloc_patient_adm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient} - {self.bed} ({self.status})"
     
-    def save(self, *args, **kwargs):
-        # Determine if this is a new allocation
-        is_new = self.pk is None
-        
-        super().save(*args, **kwargs)
-        
-        if is_new and self.status == 'ACTIVE':
-            # Update bed status to OCCUPIED
-            self.bed.status = 'OCCUPIED'
-            self.bed.save()
+    # Admissions, discharges and transfers change the bed's status too and go
+    # through beds.operations, which locks both rows and checks the bed is free
 
 class BedRequest(models.Model):
     STATUS_CHOICES = [
@@ -110,6 +112,11 @@ class BedRequest(models.Model):
     appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='bed_requests')
     expected_bed_days = models.IntegerField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+
+    # Placement constraints used by automatic bed assignment; blank means no preference
+    preferred_ward_type = models.CharField(max_length=20, choices=Ward.WARD_TYPES, blank=True)
+    preferred_bed_type = models.CharField(max_length=20, choices=Bed.BED_TYPES, blank=True)
+    max_price_per_day = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -118,3 +125,94 @@ class BedRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['patient', '-created_at', '-id'], name='bed_req_patient_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='bed_req_status_queue_idx'),
+        ]
+
+
+class BedCensus(models.Model):
+    """
+    Midnight census: beds and occupied beds per ward and bed type at the end
+    of `date`, with that day's admissions and discharges. One row per
+    (date, ward, bed type) keeps a year of history for a hospital small.
+    """
+    date = models.DateField()
+    ward = models.ForeignKey(Ward, on_delete=models.CASCADE, related_name='census')
+    # Copied from the ward so ward-type trends need no join
+    ward_type = models.CharField(max_length=20, choices=Ward.WARD_TYPES)
+    bed_type = models.CharField(max_length=20, choices=Bed.BED_TYPES)
+    total_beds = models.PositiveIntegerField(default=0)
+    occupied_beds = models.PositiveIntegerField(default=0)
+    admissions = models.PositiveIntegerField(default=0)
+    discharges = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'bed_census'
+        ordering = ['date', 'ward_id', 'bed_type']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'ward', 'bed_type'], name='unique_bed_census_day'),
+        ]
+        indexes = [
+            models.Index(fields=['ward_type', 'date'], name='census_ward_type_date_idx'),
+            models.Index(fields=['ward', 'date'], name='census_ward_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.ward_id} {self.bed_type}: {self.occupied_beds}/{self.total_beds}"
+
+
+class HousekeepingTask(models.Model):
+    """
+    Cleaning of a bed vacated by a discharge or transfer. The bed stays
+    CLEANING until the task is completed; queued, claimed and completed
+    times give the turnaround.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('IN_PROGRESS', 'In Progress'),
+        ('DONE', 'Done'),
+    ]
+    # Lower is served first; within a priority the longest waiting goes first
+    PRIORITY_BY_WARD_TYPE = {'ICU': 0}
+    DEFAULT_PRIORITY = 1
+
+    bed = models.ForeignKey(Bed, on_delete=models.CASCADE, related_name='housekeeping_tasks')
+    allocation = models.ForeignKey(BedAllocation, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='housekeeping_tasks')
+    priority = models.PositiveSmallIntegerField(default=DEFAULT_PRIORITY)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    claimed_by = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='housekeeping_tasks')
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'housekeeping_tasks'
+        ordering = ['priority', 'created_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['bed'], condition=models.Q(status__in=['PENDING', 'IN_PROGRESS']),
+                                    name='one_open_housekeeping_task_per_bed'),
+        ]
+        indexes = [
+            # The queue: the next task is the first entry for status PENDING
+            models.Index(fields=['status', 'priority', 'created_at', 'id'], name='housekeeping_queue_idx'),
+            models.Index(fields=['completed_at'], name='housekeeping_completed_idx'),
+        ]
+
+    def __str__(self):
+        return f"Clean {self.bed} ({self.status})"
+
+    @classmethod
+    def priority_for(cls, ward_type):
+        return cls.PRIORITY_BY_WARD_TYPE.get(ward_type, cls.DEFAULT_PRIORITY)
+
+    @property
+    def turnaround(self):
+        """Time from the bed being vacated to it being clean again"""
+        if self.completed_at is None:
+            return None
+        return self.completed_at - self.created_at
@@ -0,0 +1,210 @@
+# beds/operations.py
+
+from contextlib import contextmanager
+
+from django.db import DatabaseError, OperationalError, transaction
+from django.utils import timezone
+
+from clinic_backend.cache import invalidate_model_responses
+from patients.models import Patient
+from .events import beds_changed
+from .models import Bed, BedAllocation, HousekeepingTask
+
+
+class BedOperationError(Exception):
+    """A bed operation that cannot go ahead; views answer with {'error': message}"""
+    status_code = 400
+
+
+class BedConflict(BedOperationError):
+    """The bed or allocation is busy or no longer in the expected state"""
+    status_code = 409
+
+
+@contextmanager
+def _atomic():
+    """
+    transaction.atomic() that reports SQLite writer contention ("database is
+    locked") as a conflict; on PostgreSQL the row locks below report it
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except OperationalError as e:
+        if 'locked' not in str(e):
+            raise
+        raise BedConflict('Beds are being updated by another request, try again')
+
+
+def _lock(queryset, busy_message):
+    """
+    Row-lock `queryset` without waiting: a row another transaction holds
+    means a concurrent operation on the same bed, so fail fast instead of
+    queueing behind it. (SQLite has no row locks; its writes serialize.)
+    """
+    try:
+        return list(queryset.select_for_update(nowait=True, of=('self',)))
+    except DatabaseError:
+        raise BedConflict(busy_message)
+
+
+def _claim_bed(bed_id):
+    """Conditional UPDATE: only an active, AVAILABLE bed becomes OCCUPIED"""
+    if not Bed.objects.filter(id=bed_id, status='AVAILABLE', is_active=True).update(status='OCCUPIED'):
+        raise BedConflict('Bed is not available')
+
+
+def _release_bed(bed_id, allocation_id):
+    """A vacated bed needs cleaning before the next patient: queue a housekeeping task"""
+    # A bed staff moved to maintenance meanwhile keeps that status
+    if not Bed.objects.filter(id=bed_id, status='OCCUPIED').update(status='CLEANING'):
+        return
+    # The bed may have been put back in service by hand with its last task still open
+    if not HousekeepingTask.objects.filter(bed_id=bed_id, status__in=['PENDING', 'IN_PROGRESS']).exists():
+        ward_type = Bed.objects.filter(id=bed_id).values_list('ward__ward_type', flat=True).first()
+        HousekeepingTask.objects.create(bed_id=bed_id, allocation_id=allocation_id,
+                                        priority=HousekeepingTask.priority_for(ward_type))
+
+
+def _after_commit(*bed_ids):
+    # Queryset updates skip the Bed signals that drop cached ward responses
+    # and feed the bed board
+    transaction.on_commit(lambda: invalidate_model_responses(Bed))
+    beds_changed(bed_ids)
+
+
+def allocate_bed(bed_id, patient_id, reason='', notes='', bed_request=None):
+    """Admit a patient to an AVAILABLE bed; raises BedConflict if either is taken"""
+    with _atomic():
+        if not _lock(Patient.objects.filter(id=patient_id), 'Patient is being admitted by another request'):
+            raise BedOperationError('Patient not found')
+        if not _lock(Bed.objects.filter(id=bed_id), 'Bed is being updated by another request'):
+            raise BedOperationError('Bed not found')
+        if BedAllocation.objects.filter(patient_id=patient_id, status='ACTIVE').exists():
+            raise BedConflict('Patient is already admitted')
+
+        _claim_bed(bed_id)
+        allocation = BedAllocation.objects.create(
+            bed_id=bed_id,
+            patient_id=patient_id,
+            reason=reason,
+            notes=notes,
+            bed_request=bed_request,
+            status='ACTIVE',
+        )
+        _after_commit()  # the new allocation's post_save feeds the bed board
+    return allocation
+
+
+def discharge_allocation(allocation_id, discharge_date=None):
+    """End an ACTIVE allocation and send its bed to cleaning; payment stays PENDING"""
+    discharge_date = discharge_date or timezone.now()
+    with _atomic():
+        allocations = _lock(BedAllocation.objects.filter(id=allocation_id), 'Allocation is being updated')
+        if not allocations:
+            raise BedOperationError('Allocation not found')
+        allocation = allocations[0]
+        if allocation.status != 'ACTIVE':
+            raise BedConflict('Patient already discharged')
+        if discharge_date < allocation.admission_date:
+            raise BedOperationError('Discharge date cannot be before admission date')
+
+        _lock(Bed.objects.filter(id=allocation.bed_id), 'Bed is being updated by another request')
+        if not BedAllocation.objects.filter(id=allocation.id, status='ACTIVE').update(
+                status='DISCHARGED', discharge_date=discharge_date):
+            raise BedConflict('Patient already discharged')
+        _release_bed(allocation.bed_id, allocation.id)
+        _after_commit(allocation.bed_id)
+
+    allocation.status = 'DISCHARGED'
+    allocation.discharge_date = discharge_date
+    return allocation
+
+
+def transfer_allocation(allocation_id, new_bed_id):
+    """
+    Move an ACTIVE allocation to another AVAILABLE bed, sending the old one
+    to cleaning.
+    The allocation itself moves, so the stay stays one billable admission;
+    the move is recorded in its notes.
+    """
+    with _atomic():
+        allocations = _lock(BedAllocation.objects.filter(id=allocation_id), 'Allocation is being updated')
+        if not allocations:
+            raise BedOperationError('Allocation not found')
+        allocation = allocations[0]
+        if allocation.status != 'ACTIVE':
+            raise BedConflict('Only active allocations can be transferred')
+        old_bed_id = allocation.bed_id
+        if old_bed_id == new_bed_id:
+            raise BedOperationError('Patient is already in this bed')
+
+        # Both beds are locked in id order so opposite transfers cannot deadlock
+        beds = {bed.id: bed for bed in _lock(
+            Bed.objects.filter(id__in=[old_bed_id, new_bed_id]).select_related('ward').order_by('id'),
+            'Bed is being updated by another request',
+        )}
+        if new_bed_id not in beds:
+            raise BedOperationError('Bed not found')
+
+        _claim_bed(new_bed_id)
+        note = f'Transferred from {beds[old_bed_id]} to {beds[new_bed_id]} on {timezone.now():%Y-%m-%d %H:%M}'
+        allocation.notes = f'{allocation.notes}\n{note}'.strip()
+        if not BedAllocation.objects.filter(id=allocation.id, status='ACTIVE', bed_id=old_bed_id).update(
+                bed_id=new_bed_id, notes=allocation.notes):
+            raise BedConflict('Allocation changed while transferring')
+        _release_bed(old_bed_id, allocation.id)
+        _after_commit(old_bed_id, new_bed_id)
+
+    allocation.bed = beds[new_bed_id]
+    return allocation
+
+
+def claim_housekeeping_task(user, task_id=None):
+    """
+    Claim task `task_id`, or the head of the queue: the PENDING task with
+    the lowest priority, longest waiting first, read straight off
+    housekeeping_queue_idx. Tasks other staff are claiming are skipped
+    rather than waited for. Returns None when the queue is empty.
+    """
+    with _atomic():
+        tasks = HousekeepingTask.objects.filter(status='PENDING').order_by('priority', 'created_at', 'id')
+        if task_id is not None:
+            tasks = tasks.filter(id=task_id)
+        try:
+            task = tasks.select_for_update(skip_locked=True, of=('self',)).select_related('bed__ward').first()
+        except DatabaseError:
+            raise BedConflict('Housekeeping queue is busy, try again')
+        if task is None:
+            if task_id is not None:
+                raise BedConflict('Task is not pending')
+            return None
+
+        now = timezone.now()
+        if not HousekeepingTask.objects.filter(id=task.id, status='PENDING').update(
+                status='IN_PROGRESS', claimed_by=user, claimed_at=now):
+            raise BedConflict('Task was claimed by someone else')
+    task.status, task.claimed_by, task.claimed_at = 'IN_PROGRESS', user, now
+    return task
+
+
+def complete_housekeeping_task(task_id, notes=''):
+    """Finish a claimed task and put its bed back into service"""
+    with _atomic():
+        tasks = _lock(HousekeepingTask.objects.filter(id=task_id), 'Task is being updated')
+        if not tasks:
+            raise BedOperationError('Task not found')
+        task = tasks[0]
+        if task.status != 'IN_PROGRESS':
+            raise BedConflict('Only claimed tasks can be completed')
+
+        now = timezone.now()
+        task.notes = notes or task.notes
+        if not HousekeepingTask.objects.filter(id=task.id, status='IN_PROGRESS').update(
+                status='DONE', completed_at=now, notes=task.notes):
+            raise BedConflict('Task changed while completing')
+        # A bed moved to maintenance while it was being cleaned stays there
+        Bed.objects.filter(id=task.bed_id, status='CLEANING').update(status='AVAILABLE')
+        _after_commit(task.bed_id)
+    task.status, task.completed_at = 'DONE', now
+    return task
@@ -1,9 +1,11 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Ward, Bed, BedAllocation, BedRequest
+from .models import Ward, Bed, BedAllocation, BedRequest, BedCensus, HousekeepingTask
 from patients.serializers import PatientSerializer
 from doctors.serializers import DoctorSerializer
+from clinic_backend.serializers import DynamicFieldsMixin
 
-class WardSerializer(serializers.ModelSerializer):
+class WardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     total_beds = serializers.IntegerField(read_only=True)
     available_beds = serializers.IntegerField(read_only=True)
 
@@ -11,7 +13,7 @@ class WardSerializer(serializers.ModelSerializer):
         model = Ward
         fields = ['id', 'name', 'ward_type', 'floor_number', 'description', 'total_beds', 'available_beds']
 
-class BedAllocationSerializer(serializers.ModelSerializer):
+class BedAllocationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     patient_details = PatientSerializer(source='patient', read_only=True)
     patient_name = serializers.CharField(source='patient.user.full_name', read_only=True)
     patient_uhid = serializers.CharField(source='patient.uhid', read_only=True)
@@ -20,30 +22,77 @@ class BedAllocationSerializer(serializers.ModelSerializer):
     class Meta:
         model = BedAllocation
         fields = ['id', 'bed', 'bed_details', 'patient', 'patient_details', 'patient_name', 'patient_uhid', 
-                 'admission_date', 'discharge_date', 'reason', 'status', 'payment_status', 'notes']
-        read_only_fields = ['admission_date', 'discharge_date'] # discharge_date set by action
+                 'admission_date', 'discharge_date', 'reason', 'status', 'payment_status', 'notes', 'bed_request']
+        read_only_fields = ['admission_date', 'discharge_date', 'bed_request'] # discharge_date set by action
+        expandable_fields = {'bed': 'beds.serializers.BedSerializer'}
+        field_relations = {'bed_details': ['bed__ward']}
 
-class BedSerializer(serializers.ModelSerializer):
+class BedSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     ward_name = serializers.CharField(source='ward.name', read_only=True)
     current_allocation = serializers.SerializerMethodField()
     
     class Meta:
         model = Bed
         fields = ['id', 'ward', 'ward_name', 'bed_number', 'bed_type', 'price_per_day', 'status', 'is_active', 'current_allocation']
+        expandable_fields = {'ward': 'beds.serializers.WardSerializer'}
+        field_relations = {
+            'current_allocation': [Prefetch(
+                'allocations',
+                queryset=BedAllocation.objects.filter(status='ACTIVE').select_related(
+                    'bed__ward', 'patient__user__patient_profile', 'patient__user__doctor_profile'
+                ),
+                to_attr='active_allocations',
+            )],
+        }
         
     def get_current_allocation(self, obj):
         # Fetch the active allocation if it exists
-        allocation = obj.allocations.filter(status='ACTIVE').first()
+        if hasattr(obj, 'active_allocations'):
+            allocation = obj.active_allocations[0] if obj.active_allocations else None
+        else:
+            allocation = obj.allocations.filter(status='ACTIVE').first()
         if allocation:
             return BedAllocationSerializer(allocation).data
         return None
 
-class BedRequestSerializer(serializers.ModelSerializer):
+class BedRequestSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.user.full_name', read_only=True)
     doctor_name = serializers.CharField(source='doctor.user.full_name', read_only=True)
     
     class Meta:
         model = BedRequest
         fields = ['id', 'patient', 'patient_name', 'doctor', 'doctor_name', 'appointment', 
-                 'expected_bed_days', 'status', 'created_at', 'updated_at']
+                 'expected_bed_days', 'status', 'preferred_ward_type', 'preferred_bed_type',
+                 'max_price_per_day', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+        expandable_fields = {
+            'patient': 'patients.serializers.PatientSerializer',
+            'doctor': 'doctors.serializers.DoctorSerializer',
+            'appointment': 'appointments.serializers.AppointmentSerializer',
+        }
+
+class BedCensusSerializer(serializers.ModelSerializer):
+    ward_name = serializers.CharField(source='ward.name', read_only=True)
+
+    class Meta:
+        model = BedCensus
+        fields = ['id', 'date', 'ward', 'ward_name', 'ward_type', 'bed_type', 'total_beds', 'occupied_beds',
+                  'admissions', 'discharges']
+
+class HousekeepingTaskSerializer(serializers.ModelSerializer):
+    bed_number = serializers.CharField(source='bed.bed_number', read_only=True)
+    ward_name = serializers.CharField(source='bed.ward.name', read_only=True)
+    ward_type = serializers.CharField(source='bed.ward.ward_type', read_only=True)
+    claimed_by_name = serializers.CharField(source='claimed_by.full_name', read_only=True, default=None)
+    turnaround_minutes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = HousekeepingTask
+        fields = ['id', 'bed', 'bed_number', 'ward_name', 'ward_type', 'allocation', 'priority', 'status',
+                  'claimed_by', 'claimed_by_name', 'created_at', 'claimed_at', 'completed_at',
+                  'turnaround_minutes', 'notes']
+        read_only_fields = fields
+
+    def get_turnaround_minutes(self, obj):
+        turnaround = obj.turnaround
+        return round(turnaround.total_seconds() / 60, 1) if turnaround is not None else None
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from clinic_backend.cache import invalidate_model_responses
+from .events import beds_changed
+from .models import Ward, Bed, BedAllocation, BedCensus
+
+
+@receiver(post_save, sender=Ward)
+@receiver(post_delete, sender=Ward)
+@receiver(post_save, sender=Bed)
+@receiver(post_delete, sender=Bed)
+@receiver(post_save, sender=BedCensus)
+@receiver(post_delete, sender=BedCensus)
+def invalidate_ward_responses(sender, **kwargs):
+    """Drop cached ward and census responses when a ward, bed or census row changes"""
+    invalidate_model_responses(sender)
+
+
+@receiver(post_save, sender=Bed)
+@receiver(post_delete, sender=Bed)
+def publish_bed(sender, instance, **kwargs):
+    """Push the bed's new state to bed board streams"""
+    beds_changed([instance.id])
+
+
+@receiver(post_save, sender=BedAllocation)
+@receiver(post_delete, sender=BedAllocation)
+def publish_allocation_bed(sender, instance, **kwargs):
+    beds_changed([instance.bed_id])
@@ -1,13 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import WardViewSet, BedViewSet, BedAllocationViewSet, BedRequestViewSet
+from .views import (WardViewSet, BedViewSet, BedAllocationViewSet, BedRequestViewSet, BedCensusViewSet,
+                    HousekeepingTaskViewSet, BedBoardStreamView)
 
 router = DefaultRouter()
 router.register(r'wards', WardViewSet)
 router.register(r'beds', BedViewSet)
 router.register(r'allocations', BedAllocationViewSet)
 router.register(r'requests', BedRequestViewSet)
+router.register(r'census', BedCensusViewSet, basename='bed-census')
+router.register(r'housekeeping', HousekeepingTaskViewSet, basename='housekeeping-task')
 
 urlpatterns = [
+    path('board/stream/', BedBoardStreamView.as_view(), name='bed-board-stream'),
     path('', include(router.urls)),
 ]
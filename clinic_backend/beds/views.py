@@ -1,20 +1,67 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status, filters, serializers
 from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Ward, Bed, BedAllocation, BedRequest
-from .serializers import WardSerializer, BedSerializer, BedAllocationSerializer, BedRequestSerializer
+from rest_framework.views import APIView
+from .models import Ward, Bed, BedAllocation, BedRequest, BedCensus, HousekeepingTask
+from .assignment import assign_pending_requests
+from .events import open_stream, parse_event_id
+from .forecast import MAX_DAYS, MAX_SIMULATIONS, forecast_capacity
+from .operations import (BedOperationError, allocate_bed, claim_housekeeping_task, complete_housekeeping_task,
+                         discharge_allocation, transfer_allocation)
+from .serializers import (WardSerializer, BedSerializer, BedAllocationSerializer, BedRequestSerializer, BedCensusSerializer,
+                          HousekeepingTaskSerializer)
+from datetime import timedelta
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Sum
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from accounts.permissions import IsAdminOrStaff
+from billing.charges import allocation_charges
+from clinic_backend.cache import CachedResponseMixin, cache_response
+from clinic_backend.conditional import ConditionalGetMixin
+from clinic_backend.serializers import OptimizedQuerysetMixin
 
-class WardViewSet(viewsets.ModelViewSet):
+class WardViewSet(CachedResponseMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Ward.objects.all()
     serializer_class = WardSerializer
     permission_classes = [IsAuthenticated, IsAdminOrStaff]
+    # Bed counts per ward move with every bed status change
+    cache_models = (Ward, Bed)
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'ward_type']
 
-class BedViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def forecast(self, request):
+        """
+        Projected free beds per ward type for the next ?days= days (default 14).
+        ?simulations=N runs a Monte Carlo over recorded lengths of stay instead
+        of using expected stays; ?seed= makes it repeatable.
+        """
+        params = request.query_params
+        try:
+            days = int(params.get('days') or 14)
+            simulations = int(params.get('simulations') or 0)
+            seed = int(params['seed']) if params.get('seed') else None
+        except ValueError:
+            return Response({'error': 'days, simulations and seed must be integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= MAX_DAYS:
+            return Response({'error': f'days must be between 1 and {MAX_DAYS}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= simulations <= MAX_SIMULATIONS:
+            return Response({'error': f'simulations must be between 0 and {MAX_SIMULATIONS}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'days': days,
+            'simulations': simulations,
+            'ward_types': forecast_capacity(days=days, simulations=simulations, seed=seed),
+        })
+
+class BedViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Bed.objects.all()
     serializer_class = BedSerializer
     permission_classes = [IsAuthenticated, IsAdminOrStaff]
@@ -33,12 +80,28 @@ class BedViewSet(viewsets.ModelViewSet):
             
         return queryset
 
-class BedAllocationViewSet(viewsets.ModelViewSet):
+class BedAllocationViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = BedAllocation.objects.all()
     serializer_class = BedAllocationSerializer
     permission_classes = [IsAuthenticated, IsAdminOrStaff]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['patient__user__full_name', 'bed__bed_number']
+    ordering_fields = ['patient__user__full_name', 'admission_date', 'discharge_date']
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            allocation = allocate_bed(
+                data['bed'].id,
+                data['patient'].id,
+                reason=data.get('reason', ''),
+                notes=data.get('notes', ''),
+            )
+        except BedOperationError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self.get_serializer(allocation).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
     def discharge(self, request, pk=None):
@@ -69,29 +132,51 @@ class BedAllocationViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
             
-        # Validation
-        if discharge_date < allocation.admission_date:
-            return Response({'error': 'Discharge date cannot be before admission date'}, status=status.HTTP_400_BAD_REQUEST)
-            
-        # Update allocation status
-        allocation.status = 'DISCHARGED'
-        allocation.discharge_date = discharge_date
-        # Payment status remains PENDING until paid
-        allocation.save()
-        
-        # Free up the bed immediately so it can be used
-        bed = allocation.bed
-        bed.status = 'AVAILABLE'
-        bed.save()
-        
+        # Payment status remains PENDING until paid; the bed goes to the housekeeping queue
+        try:
+            discharge_allocation(allocation.id, discharge_date)
+        except BedOperationError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+
         return Response({'status': 'Patient discharged successfully. Payment pending.'})
 
-class BedRequestViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'])
+    def transfer(self, request, pk=None):
+        allocation = self.get_object()
+        bed_id = request.data.get('bed')
+        if not bed_id:
+            return Response({'error': 'Target bed is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            allocation = transfer_allocation(allocation.id, int(bed_id))
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid bed'}, status=status.HTTP_400_BAD_REQUEST)
+        except BedOperationError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self.get_serializer(allocation).data)
+
+    @action(detail=True, methods=['get'])
+    def charges(self, request, pk=None):
+        """Running bed charges of the stay: accrued days plus any since the last nightly accrual"""
+        allocation = self.get_object()
+        bed_charge, bed_days, bed_charge_per_day = allocation_charges(allocation)
+        return Response({
+            'allocation': allocation.id,
+            'status': allocation.status,
+            'payment_status': allocation.payment_status,
+            'bed_days': bed_days,
+            'bed_charge_per_day': bed_charge_per_day,
+            'bed_charge': bed_charge,
+            'items': list(allocation.charge_items.values('day', 'charge_date', 'bed_id', 'amount', 'billing_id')),
+        })
+
+class BedRequestViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = BedRequest.objects.all()
     serializer_class = BedRequestSerializer
     permission_classes = [IsAuthenticated, IsAdminOrStaff]
-    filter_backends = [filters.SearchFilter]
+    etag_timestamp_fields = ('updated_at', 'patient__user__updated_at', 'doctor__user__updated_at')
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['patient__user__full_name', 'doctor__user__full_name']
+    ordering_fields = ['patient__user__full_name', 'doctor__user__full_name', 'created_at']
     
     def get_queryset(self):
         qs = BedRequest.objects.all().select_related('patient__user', 'doctor__user')
@@ -99,3 +184,212 @@ class BedRequestViewSet(viewsets.ModelViewSet):
         if status_param:
             qs = qs.filter(status=status_param)
         return qs
+
+    @action(detail=False, methods=['post'])
+    def auto_assign(self, request):
+        """Place pending requests, oldest first, into matching available beds"""
+        try:
+            limit = int(request.data.get('limit') or 0) or None
+        except (TypeError, ValueError):
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        assigned, unassigned = assign_pending_requests(limit=limit, dry_run=dry_run)
+        return Response({
+            'dry_run': dry_run,
+            'assigned_count': len(assigned),
+            'unassigned_count': len(unassigned),
+            'assigned': assigned,
+            'unassigned': unassigned,
+        })
+
+
+class BedCensusViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    """Daily bed census rows, filterable by ?start=, ?end=, ?ward=, ?ward_type= and ?bed_type="""
+    serializer_class = BedCensusSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrStaff]
+    cache_models = (BedCensus,)
+    trend_groups = {'ward_type': 'ward_type', 'ward': 'ward_id', 'bed_type': 'bed_type', 'total': None}
+
+    def get_queryset(self):
+        queryset = BedCensus.objects.select_related('ward')
+        params = self.request.query_params
+        try:
+            start = parse_date(params.get('start') or '') or timezone.localdate() - timedelta(days=90)
+            end = parse_date(params.get('end') or '') or timezone.localdate()
+        except ValueError:
+            # Well-formed but impossible dates, e.g. 2026-02-30
+            raise serializers.ValidationError({'error': 'start and end must be valid YYYY-MM-DD dates'})
+        if end < start:
+            raise serializers.ValidationError({'error': 'end must be on or after start'})
+        if params.get('ward') and not params['ward'].isdigit():
+            raise serializers.ValidationError({'error': 'ward must be an integer'})
+        queryset = queryset.filter(date__gte=start, date__lte=end)
+        for field in ('ward', 'ward_type', 'bed_type'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    @cache_response
+    def trends(self, request):
+        """Occupancy per day summed by ?group_by=ward_type (default), ward, bed_type or total"""
+        group_by = request.query_params.get('group_by', 'ward_type')
+        if group_by not in self.trend_groups:
+            return Response({'error': f"group_by must be one of {', '.join(self.trend_groups)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        group_field = self.trend_groups[group_by]
+        fields = ['date'] + ([group_field] if group_field else [])
+
+        rows = (self.get_queryset().order_by().values(*fields)
+                .annotate(total_beds=Sum('total_beds'), occupied_beds=Sum('occupied_beds'),
+                          admissions=Sum('admissions'), discharges=Sum('discharges'))
+                .order_by(*fields[::-1]))
+        series = {}
+        for row in rows:
+            group = row[group_field] if group_field else 'total'
+            total = row['total_beds']
+            series.setdefault(group, []).append({
+                'date': row['date'],
+                'total_beds': total,
+                'occupied_beds': row['occupied_beds'],
+                'occupancy_rate': round(row['occupied_beds'] / total, 4) if total else None,
+                'admissions': row['admissions'],
+                'discharges': row['discharges'],
+            })
+        return Response({
+            'group_by': group_by,
+            'series': [{'group': group, 'points': points} for group, points in series.items()],
+        })
+
+
+class HousekeepingTaskViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Beds waiting for cleaning in queue order (ICU first, then longest
+    waiting). Lists open tasks unless ?status= is given; ?ward_type= filters.
+    """
+    serializer_class = HousekeepingTaskSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrStaff]
+
+    def get_queryset(self):
+        queryset = HousekeepingTask.objects.select_related('bed__ward', 'claimed_by')
+        params = self.request.query_params
+        if self.action == 'list':
+            if params.get('status'):
+                queryset = queryset.filter(status=params['status'])
+            else:
+                queryset = queryset.filter(status__in=['PENDING', 'IN_PROGRESS'])
+        if params.get('ward_type'):
+            queryset = queryset.filter(bed__ward__ward_type=params['ward_type'])
+        return queryset
+
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        """Claim the next task in the queue, or a specific one with {"task": id}"""
+        task_id = request.data.get('task')
+        try:
+            task = claim_housekeeping_task(request.user, int(task_id) if task_id else None)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid task'}, status=status.HTTP_400_BAD_REQUEST)
+        except BedOperationError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        if task is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(self.get_serializer(task).data)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Mark a claimed task done, making its bed available again"""
+        task = self.get_object()
+        try:
+            complete_housekeeping_task(task.id, notes=request.data.get('notes', ''))
+        except BedOperationError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self.get_serializer(self.get_queryset().get(id=task.id)).data)
+
+    @action(detail=False, methods=['get'])
+    def turnaround(self, request):
+        """Average wait, cleaning and total turnaround per ward type for tasks done in the last ?days= (30)"""
+        try:
+            days = int(request.query_params.get('days') or 30)
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        def minutes(value):
+            return round(value.total_seconds() / 60, 1) if value is not None else None
+
+        def duration(end, start):
+            return ExpressionWrapper(F(end) - F(start), output_field=DurationField())
+
+        done = {row['bed__ward__ward_type']: row for row in (
+            HousekeepingTask.objects
+            .filter(status='DONE', completed_at__gte=timezone.now() - timedelta(days=days))
+            .values('bed__ward__ward_type')
+            .annotate(completed=Count('id'),
+                      wait=Avg(duration('claimed_at', 'created_at')),
+                      cleaning=Avg(duration('completed_at', 'claimed_at')),
+                      turnaround=Avg(duration('completed_at', 'created_at')),
+                      longest=Max(duration('completed_at', 'created_at')))
+            .order_by()
+        )}
+        waiting = dict(HousekeepingTask.objects.filter(status__in=['PENDING', 'IN_PROGRESS'])
+                       .values_list('bed__ward__ward_type').annotate(n=Count('id')).order_by())
+
+        ward_types = []
+        for ward_type in sorted(set(done) | set(waiting)):
+            row = done.get(ward_type, {})
+            ward_types.append({
+                'ward_type': ward_type,
+                'completed': row.get('completed', 0),
+                'open': waiting.get(ward_type, 0),
+                'avg_wait_minutes': minutes(row.get('wait')),
+                'avg_cleaning_minutes': minutes(row.get('cleaning')),
+                'avg_turnaround_minutes': minutes(row.get('turnaround')),
+                'max_turnaround_minutes': minutes(row.get('longest')),
+            })
+        return Response({'days': days, 'ward_types': ward_types})
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets clients ask for text/event-stream; only errors are rendered through it"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        message = f'event: error\ndata: {JSONRenderer().render(data).decode()}\n\n'
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.has_header('Retry-After'):
+            # Tell EventSource-style clients when to reconnect
+            message = f'retry: {int(response["Retry-After"]) * 1000}\n' + message
+        return message.encode()
+
+
+class BedBoardStreamView(APIView):
+    """
+    Server-sent events with bed status changes for nurses' station boards.
+    Starts with a snapshot of every bed; reconnects resume from Last-Event-ID
+    (or ?since=). ?ward= limits the board to one ward. Each process serves at
+    most BED_BOARD_MAX_STREAMS boards at once; beyond that it answers 503
+    with a retry delay so streams can't take every request thread.
+    """
+    permission_classes = [IsAuthenticated, IsAdminOrStaff]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get(self, request):
+        # An id from another worker or an earlier process just gets a fresh snapshot
+        since = parse_event_id(request.headers.get('Last-Event-ID') or request.query_params.get('since'))
+        try:
+            ward_id = int(request.query_params['ward']) if request.query_params.get('ward') else None
+        except ValueError:
+            return Response({'error': 'ward must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = open_stream(since, ward_id)
+        if events is None:
+            return Response({'error': 'Too many open bed boards, retry shortly'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={'Retry-After': str(settings.BED_BOARD_RETRY_AFTER)})
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -26,6 +26,7 @@ class BillingAdmin(admin.ModelAdmin):
     def get_patient_name(self, obj):
         return obj.patient.user.full_name
     get_patient_name.short_description = 'Patient'
+    get_patient_name.admin_order_field = 'patient__user__full_name'
     
     def balance(self, obj):
         return obj.total_amount - obj.paid_amount
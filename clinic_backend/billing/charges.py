@@ -0,0 +1,84 @@
+# billing/charges.py
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from beds.models import BedAllocation
+from .models import BedChargeLineItem
+
+
+def charged_days(admission_date, end_date):
+    """Whole days between admission and `end_date`, with a one day minimum"""
+    if timezone.is_naive(admission_date):
+        admission_date = timezone.make_aware(admission_date)
+    if timezone.is_naive(end_date):
+        end_date = timezone.make_aware(end_date)
+    return max((end_date - admission_date).days, 1)
+
+
+def _missing_items(allocation_id, bed_id, price, admission_date, accrued, end_date):
+    if timezone.is_aware(admission_date):
+        admission_date = timezone.localtime(admission_date)
+    admitted_on = admission_date.date()
+    return [
+        BedChargeLineItem(allocation_id=allocation_id, bed_id=bed_id, day=day,
+                          charge_date=admitted_on + timedelta(days=day - 1), amount=price)
+        for day in range(accrued + 1, charged_days(admission_date, end_date) + 1)
+    ]
+
+
+def accrue_bed_charges(until=None, batch_size=2000):
+    """
+    Add the bed days every ACTIVE allocation has run up to `until` (now by
+    default) that have no line item yet. The allocations, their current bed
+    price and the last accrued day come from one query and the new days are
+    written with bulk inserts, so the nightly run costs the same whether a
+    stay is two days or two months old. Returns the number of items added.
+    """
+    until = until or timezone.now()
+    allocations = (BedAllocation.objects.filter(status='ACTIVE')
+                   .annotate(accrued=Coalesce(Max('charge_items__day'), 0))
+                   .values_list('id', 'bed_id', 'bed__price_per_day', 'admission_date', 'accrued'))
+    items = []
+    for allocation_id, bed_id, price, admission_date, accrued in allocations.iterator(chunk_size=2000):
+        items.extend(_missing_items(allocation_id, bed_id, price, admission_date, accrued, until))
+    # A concurrent run may have written some of the same days
+    BedChargeLineItem.objects.bulk_create(items, batch_size=batch_size, ignore_conflicts=True)
+    return len(items)
+
+
+def allocation_charges(allocation, save=False):
+    """
+    (bed_charge, bed_days, bed_charge_per_day) of an allocation so far: its
+    accrued line items plus the days since the last accrual, priced at the
+    current bed. With `save` the missing days are stored, so invoicing only
+    ever prices the tail of a stay.
+    """
+    end_date = allocation.discharge_date or timezone.now()
+    days = charged_days(allocation.admission_date, end_date)
+    # A backdated discharge can end the stay before days already accrued
+    accrued = (allocation.charge_items.filter(day__lte=days)
+               .aggregate(total=Coalesce(Sum('amount'), Decimal('0')), count=Count('id'), last=Max('day')))
+    missing = _missing_items(allocation.id, allocation.bed_id, allocation.bed.price_per_day,
+                             allocation.admission_date, accrued['last'] or 0, end_date)
+    if save and missing:
+        BedChargeLineItem.objects.bulk_create(missing, ignore_conflicts=True)
+
+    bed_charge = accrued['total'] + sum((item.amount for item in missing), Decimal('0'))
+    return float(bed_charge), accrued['count'] + len(missing), float(allocation.bed.price_per_day)
+
+
+def bed_charges(patient, save=False):
+    """
+    allocation_charges() of the patient's most recent unpaid allocation,
+    plus the allocation; (0, 0, 0, None) when nothing is billable
+    """
+    allocation = (patient.bed_allocations.filter(payment_status='PENDING', status__in=['ACTIVE', 'DISCHARGED'])
+                  .select_related('bed').order_by('-admission_date').first())
+    if allocation is None or allocation.bed is None:
+        return 0, 0, 0, None
+    return (*allocation_charges(allocation, save=save), allocation)
@@ -0,0 +1,168 @@
+# billing/invoices.py
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.template.loader import render_to_string
+
+from .models import Billing
+
+INVOICE_FORMATS = {
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+
+class InvoiceRenderError(Exception):
+    """Raised when an invoice document cannot be produced"""
+
+
+def invoice_queryset():
+    """Billing rows with everything the printable invoice touches joined in"""
+    return Billing.objects.select_related(
+        'patient__user',
+        'appointment__doctor__user',
+        'appointment__doctor__department',
+    )
+
+
+def _age(date_of_birth):
+    if not date_of_birth:
+        return None
+    today = date.today()
+    return today.year - date_of_birth.year - (
+        (today.month, today.day) < (date_of_birth.month, date_of_birth.day)
+    )
+
+
+def build_invoice_context(invoice):
+    """
+    Flatten a Billing row into the plain dict used by both the JSON print
+    payload and the HTML/PDF templates. Only plain values are kept so the
+    context can be shipped to worker processes.
+    """
+    patient = invoice.patient
+    doctor = invoice.appointment.doctor
+    return {
+        'id': invoice.id,
+        'invoice_number': invoice.invoice_number,
+        'date': invoice.created_at,
+        'patient': {
+            'name': patient.user.full_name,
+            'uhid': patient.uhid,
+            'age': _age(patient.date_of_birth),
+            'gender': patient.get_gender_display(),
+            'contact': patient.user.phone,
+            'address': patient.address,
+        },
+        'doctor': {
+            'name': doctor.user.full_name,
+            'department': doctor.department.name if doctor.department else 'General',
+        },
+        'appointment': {
+            'date': invoice.appointment.appointment_date,
+            'case_type': invoice.appointment.case_type,
+        },
+        'billing': {
+            'doctor_fee': invoice.doctor_fee,
+            'hospital_charge': invoice.hospital_charge,
+            'bed_days': invoice.bed_days,
+            'bed_charge_per_day': invoice.bed_charge_per_day,
+            'bed_charge': invoice.bed_charge,
+            'discount_percentage': invoice.discount_percentage,
+            'discount_amount': invoice.discount_amount,
+            'total_amount': invoice.total_amount,
+            'final_amount': invoice.final_amount,
+            'paid_amount': invoice.paid_amount,
+            'balance': invoice.balance,
+            'payment_status': invoice.payment_status,
+            'payment_method': invoice.payment_method,
+        },
+        'notes': invoice.notes,
+    }
+
+
+def render_invoice_html(context):
+    return render_to_string('billing/invoice.html', {'invoice': context})
+
+
+def render_invoice_pdf(html):
+    try:
+        from xhtml2pdf import pisa
+    except ImportError:
+        raise InvoiceRenderError('PDF rendering requires the xhtml2pdf package')
+
+    output = BytesIO()
+    result = pisa.CreatePDF(html, dest=output, encoding='utf-8')
+    if result.err:
+        raise InvoiceRenderError('Failed to render invoice PDF')
+    return output.getvalue()
+
+
+def render_invoice_document(context, fmt):
+    """Render an invoice context to bytes in the requested format"""
+    if fmt not in INVOICE_FORMATS:
+        raise InvoiceRenderError(f'Unsupported invoice format: {fmt}')
+    html = render_invoice_html(context)
+    if fmt == 'pdf':
+        return render_invoice_pdf(html)
+    return html.encode('utf-8')
+
+
+def invoice_cache_key(invoice, fmt):
+    # updated_at moves on every save, so an edited invoice never serves a stale document
+    return f"invoice-doc:{invoice.id}:{invoice.updated_at.timestamp()}:{fmt}"
+
+
+def get_invoice_document(invoice, fmt):
+    """Return the rendered document for an invoice, rendering it on a cache miss"""
+    key = invoice_cache_key(invoice, fmt)
+    document = cache.get(key)
+    if document is None:
+        document = render_invoice_document(build_invoice_context(invoice), fmt)
+        cache.set(key, document, settings.INVOICE_CACHE_TIMEOUT)
+    return document
+
+
+def _render_in_worker(context, fmt):
+    # Spawned workers start without Django configured; forked ones inherit it
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    return render_invoice_document(context, fmt)
+
+
+def render_invoices_batch(invoices, fmt, max_workers=None):
+    """
+    Render many invoices at once, e.g. for month-end printing.
+
+    Cached documents are reused; the rest are rendered in a process pool
+    from contexts built up front, so workers never touch the database.
+    Returns a list of (invoice, document) pairs in input order.
+    """
+    invoices = list(invoices)
+    documents = {}
+    pending = []
+    for invoice in invoices:
+        document = cache.get(invoice_cache_key(invoice, fmt))
+        if document is None:
+            pending.append(invoice)
+        else:
+            documents[invoice.id] = document
+
+    if pending:
+        contexts = [build_invoice_context(invoice) for invoice in pending]
+        # Don't hand open database sockets to the worker processes
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rendered = executor.map(_render_in_worker, contexts, [fmt] * len(contexts))
+            for invoice, document in zip(pending, rendered):
+                documents[invoice.id] = document
+                cache.set(invoice_cache_key(invoice, fmt), document, settings.INVOICE_CACHE_TIMEOUT)
+
+    return [(invoice, documents[invoice.id]) for invoice in invoices]
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from billing.charges import accrue_bed_charges
+
+
+class Command(BaseCommand):
+    help = 'Accrue bed-day line items for every active admission (run nightly)'
+
+    def handle(self, *args, **options):
+        items = accrue_bed_charges()
+        self.stdout.write(self.style.SUCCESS(f'Accrued {items} bed days'))
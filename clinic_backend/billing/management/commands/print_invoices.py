@@ -0,0 +1,44 @@
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from billing.invoices import INVOICE_FORMATS, InvoiceRenderError, invoice_queryset, render_invoices_batch
+
+
+class Command(BaseCommand):
+    help = 'Render printable invoices in bulk (e.g. month-end printing) using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Render every invoice created in this month (YYYY-MM)')
+        parser.add_argument('--ids', nargs='+', type=int, help='Render these invoice ids')
+        parser.add_argument('--format', default='pdf', choices=sorted(INVOICE_FORMATS), help='Output format')
+        parser.add_argument('--output', default='invoices', help='Directory to write documents to')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (defaults to CPU count)')
+
+    def handle(self, *args, **options):
+        invoices = invoice_queryset().order_by('created_at')
+        if options['ids']:
+            invoices = invoices.filter(id__in=options['ids'])
+        elif options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m')
+            except ValueError:
+                raise CommandError('--month must be in YYYY-MM format')
+            invoices = invoices.filter(created_at__year=month.year, created_at__month=month.month)
+        else:
+            raise CommandError('Pass either --month or --ids')
+
+        fmt = options['format']
+        os.makedirs(options['output'], exist_ok=True)
+
+        try:
+            rendered = render_invoices_batch(invoices, fmt, max_workers=options['workers'])
+        except InvoiceRenderError as e:
+            raise CommandError(str(e))
+
+        for invoice, document in rendered:
+            path = os.path.join(options['output'], f'{invoice.invoice_number}.{fmt}')
+            with open(path, 'wb') as f:
+                f.write(document)
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {len(rendered)} invoices to {options["output"]}'))
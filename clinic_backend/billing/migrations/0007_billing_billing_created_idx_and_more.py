@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0006_billing_bed_charge_per_day_billing_bed_days'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billing',
+            index=models.Index(fields=['-created_at', '-id'], name='billing_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billing',
+            index=models.Index(fields=['patient', '-created_at', '-id'], name='billing_patient_created_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beds', '0006_bedcensus_bedcensus_unique_bed_census_day'),
+        ('billing', '0007_billing_billing_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BedChargeLineItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.PositiveIntegerField()),
+                ('charge_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('allocation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='charge_items', to='beds.bedallocation')),
+                ('bed', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='charge_items', to='beds.bed')),
+                ('billing', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bed_charge_items', to='billing.billing')),
+            ],
+            options={
+                'db_table': 'bed_charge_line_items',
+                'ordering': ['allocation', 'day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bedchargelineitem',
+            constraint=models.UniqueConstraint(fields=('allocation', 'day'), name='unique_bed_charge_day'),
+        ),
+    ]
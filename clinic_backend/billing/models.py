@@ -42,6 +42,10 @@ class Billing(models.Model):
     class Meta:
         db_table = 'billing'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='billing_created_idx'),
+            models.Index(fields=['patient', '-created_at', '-id'], name='billing_patient_created_idx'),
+        ]
     
     def __str__(self):
         return f"Invoice {self.invoice_number} - {self.patient.user.full_name}"
@@ -54,4 +58,30 @@ class Billing(models.Model):
     @property
     def balance(self):
         """Calculate remaining balance"""
-        return self.final_amount - self.paid_amount
\ No newline at end of file
+        return self.final_amount - self.paid_amount
+
+
+class BedChargeLineItem(models.Model):
+    """
+    One charged bed day of an allocation, accrued nightly while the patient
+    is admitted and topped up when the invoice is created. Each day is
+    priced at the bed the patient occupied when it was accrued.
+    """
+    allocation = models.ForeignKey('beds.BedAllocation', on_delete=models.CASCADE, related_name='charge_items')
+    bed = models.ForeignKey('beds.Bed', on_delete=models.PROTECT, related_name='charge_items')
+    billing = models.ForeignKey(Billing, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='bed_charge_items')
+    day = models.PositiveIntegerField()  # 1 for the first day of the stay
+    charge_date = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'bed_charge_line_items'
+        ordering = ['allocation', 'day']
+        constraints = [
+            models.UniqueConstraint(fields=['allocation', 'day'], name='unique_bed_charge_day'),
+        ]
+
+    def __str__(self):
+        return f"Bed day {self.day} of allocation {self.allocation_id}: {self.amount}"
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from .models import Billing
+from clinic_backend.serializers import DynamicFieldsMixin
 
-class BillingSerializer(serializers.ModelSerializer):
+class BillingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.user.full_name', read_only=True)
     patient_uhid = serializers.CharField(source='patient.uhid', read_only=True)
     doctor_name = serializers.CharField(source='appointment.doctor.user.full_name', read_only=True)
@@ -25,6 +26,13 @@ class BillingSerializer(serializers.ModelSerializer):
             'notes', 'created_at', 'updated_at', 'appointment_details'
         ]
         read_only_fields = ['created_at', 'updated_at', 'invoice_number']
+        expandable_fields = {
+            'appointment': 'appointments.serializers.AppointmentSerializer',
+            'patient': 'patients.serializers.PatientSerializer',
+        }
+        field_relations = {
+            'appointment_details': ['appointment__doctor__user'],
+        }
     
     def get_appointment_details(self, obj):
         return {
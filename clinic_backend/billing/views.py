@@ -3,21 +3,34 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Prefetch, Q
+from django.http import HttpResponse
 from .models import Billing
 from .serializers import BillingSerializer
+from .charges import bed_charges
+from .invoices import (INVOICE_FORMATS, InvoiceRenderError, build_invoice_context,
+                       get_invoice_document)
 from appointments.models import Appointment
 from accounts.permissions import IsAdminOrStaff
 from support.models import Notification
 from accounts.models import User
+from clinic_backend.pagination import CreatedAtCursorPagination
+from clinic_backend.conditional import ConditionalGetMixin
+from clinic_backend.serializers import OptimizedQuerysetMixin
 import random
 import string
 from django.utils import timezone
 from django.db.models import Sum
 from decimal import Decimal
 
-class BillingViewSet(viewsets.ModelViewSet):
+class BillingViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = BillingSerializer
     permission_classes = [IsAuthenticated]
+    # Only role and profile ids are read here, so signed token claims suffice
+    stateless_auth_actions = ('list', 'retrieve')
+    etag_timestamp_fields = ('updated_at', 'patient__user__updated_at', 'appointment__updated_at',
+                             'appointment__doctor__user__updated_at')
+    pagination_class = CreatedAtCursorPagination
+    pagination_count_mode = 'estimate'
     
     def get_queryset(self):
         user = self.request.user
@@ -25,6 +38,7 @@ class BillingViewSet(viewsets.ModelViewSet):
             'appointment',
             'appointment__patient__user',
             'appointment__doctor__user',
+            'appointment__doctor__department',
             'patient__user'
         ).prefetch_related('appointment__prescriptions')
         
@@ -62,46 +76,13 @@ class BillingViewSet(viewsets.ModelViewSet):
         doctor_fee = appointment.doctor.consultation_fee
         hospital_charge = float(doctor_fee) * 0.10
         
-        # Calculate bed charges
+        # Calculate bed charges: accrued bed days plus any not accrued yet
         bed_charge = 0
         bed_days = 0
         bed_charge_per_day = 0
 
         try:
-            # Calculate total days in hospital if any allocations exist
-            # We look for the most relevant allocation (active or recently discharged)
-            # STRICT CHECK: Only consider allocations that haven't been paid for AND are valid
-            allocations = appointment.patient.bed_allocations.filter(
-                payment_status='PENDING',
-                status__in=['ACTIVE', 'DISCHARGED'] # Must be explicitly Active or Discharged
-            ).order_by('-admission_date')
-            
-            if allocations.exists():
-                allocation = allocations.first()
-                # Ensure bed exists (though it should due to foreign key constraints, checking safely)
-                # AND ensure bed is actually assigned (allocation.bed is not None)
-                if hasattr(allocation, 'bed') and allocation.bed:
-                    start_date = allocation.admission_date
-                    end_date = allocation.discharge_date if allocation.discharge_date else timezone.now()
-                    
-                    # Ensure timezone compatibility
-                    if timezone.is_naive(start_date):
-                        start_date = timezone.make_aware(start_date)
-                    if timezone.is_naive(end_date):
-                        end_date = timezone.make_aware(end_date)
-                    
-                    # Calculate duration
-                    duration = end_date - start_date
-                    days = duration.days
-                    
-                    # Minimum 1 day charge
-                    if days < 1:
-                        days = 1
-                    
-                    bed_days = days
-                    bed_charge_per_day = float(allocation.bed.price_per_day)
-                    bed_charge = bed_days * bed_charge_per_day
-                    
+            bed_charge, bed_days, bed_charge_per_day, _ = bed_charges(appointment.patient)
         except Exception as e:
             print(f"Error calculating bed charges: {e}")
             pass
@@ -192,43 +173,14 @@ class BillingViewSet(viewsets.ModelViewSet):
         doctor_fee = appointment.doctor.consultation_fee
         hospital_charge = float(doctor_fee) * 0.10
         
-        # Calculate bed charges
+        # Calculate bed charges, storing the bed days not accrued yet
         bed_charge = 0
         bed_days = 0
         bed_charge_per_day = 0
-        
+        bed_allocation = None
+
         try:
-            # Find allocations related to this patient
-            # STRICT CHECK: Only consider allocations that haven't been paid for AND are valid
-            allocations = appointment.patient.bed_allocations.filter(
-                payment_status='PENDING',
-                status__in=['ACTIVE', 'DISCHARGED'] # Must be explicitly Active or Discharged
-            ).order_by('-admission_date')
-            
-            if allocations.exists():
-                allocation = allocations.first()
-                if hasattr(allocation, 'bed') and allocation.bed:
-                    start_date = allocation.admission_date
-                    end_date = allocation.discharge_date if allocation.discharge_date else timezone.now()
-                    
-                    # Ensure timezone compatibility
-                    if timezone.is_naive(start_date):
-                        start_date = timezone.make_aware(start_date)
-                    if timezone.is_naive(end_date):
-                        end_date = timezone.make_aware(end_date)
-                    
-                    # Calculate duration
-                    duration = end_date - start_date
-                    days = duration.days
-                    
-                    # Minimum 1 day charge
-                    if days < 1:
-                        days = 1
-                        
-                    bed_days = days
-                    bed_charge_per_day = float(allocation.bed.price_per_day)
-                    bed_charge = bed_days * bed_charge_per_day
-                    
+            bed_charge, bed_days, bed_charge_per_day, bed_allocation = bed_charges(appointment.patient, save=True)
         except Exception as e:
             print(f"Error calculating bed charges in creation: {e}")
             pass
@@ -290,6 +242,8 @@ class BillingViewSet(viewsets.ModelViewSet):
             final_amount=final_amount,
             total_amount=gross_amount # Using gross for total, final for payable
         )
+        if bed_allocation is not None:
+            bed_allocation.charge_items.filter(day__lte=bed_days).update(billing=billing)
         
         # Notify Patient of Bill Generation
         Notification.objects.create(
@@ -315,41 +269,25 @@ class BillingViewSet(viewsets.ModelViewSet):
     def print_details(self, request, pk=None):
         """Get details specifically for printing"""
         invoice = self.get_object()
-        serializer = BillingSerializer(invoice)
-        data = serializer.data
-        
-        # Flatten structure for easier frontend consumption if needed
-        # Or just return serializer data which is already rich
-        
-        # Ensure we have all needed fields
-        response_data = {
-            'invoice_number': invoice.invoice_number,
-            'date': invoice.created_at,
-            'patient': {
-                'name': invoice.patient.user.full_name,
-                'age': invoice.patient.age,
-                'gender': invoice.patient.gender,
-                'contact': invoice.patient.contact_number, 
-                'address': invoice.patient.address
-            },
-            'doctor': {
-                'name': invoice.appointment.doctor.user.full_name,
-                'department': invoice.appointment.doctor.department.name if invoice.appointment.doctor.department else 'General',
-            },
-            'appointment': {
-                'date': invoice.appointment.appointment_date,
-                'case_type': invoice.appointment.case_type,
-            },
-            'billing': {
-                'doctor_fee': invoice.doctor_fee,
-                'hospital_charge': invoice.hospital_charge,
-                'discount_percentage': invoice.discount_percentage,
-                'discount_amount': invoice.discount_amount,
-                'final_amount': invoice.final_amount, # or total_amount
-                'total_amount': invoice.total_amount 
-            }
-        }
-        return Response(response_data)
+        return Response(build_invoice_context(invoice))
+
+    @action(detail=True, methods=['get'])
+    def document(self, request, pk=None):
+        """Get the printable invoice as an HTML or PDF document (?type=html|pdf)"""
+        invoice = self.get_object()
+        fmt = request.query_params.get('type', 'pdf').lower()
+        if fmt not in INVOICE_FORMATS:
+            return Response({'error': 'type must be html or pdf'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            document = get_invoice_document(invoice, fmt)
+        except InvoiceRenderError as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        response = HttpResponse(document, content_type=INVOICE_FORMATS[fmt])
+        if fmt == 'pdf':
+            response['Content-Disposition'] = f'inline; filename="{invoice.invoice_number}.pdf"'
+        return response
     
     @action(detail=True, methods=['post'], permission_classes=[IsAdminOrStaff])
     def mark_paid(self, request, pk=None):
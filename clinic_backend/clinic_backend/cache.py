@@ -0,0 +1,125 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdmin
+
+KEY_PREFIX = 'response-cache'
+
+# Names of every view using the response cache, for the stats endpoint
+_cached_views = set()
+
+
+def _version_key(model):
+    return f'{KEY_PREFIX}:version:{model._meta.label_lower}'
+
+
+def invalidate_model_responses(model):
+    """
+    Retire every cached response that depends on `model`.
+
+    Each model has a version token that is folded into the cache keys of
+    the responses built from it, so replacing the token orphans all of
+    them at once without having to find or delete individual keys.
+    """
+    cache.set(_version_key(model), time.time_ns(), None)
+
+
+def _model_versions(models):
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed with a fresh token (never 0) so an evicted version can't revive old entries
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _count(view_name, outcome):
+    key = f'{KEY_PREFIX}:stats:{view_name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def response_cache_stats():
+    stats = {}
+    for name in sorted(_cached_views):
+        counts = cache.get_many([f'{KEY_PREFIX}:stats:{name}:hit', f'{KEY_PREFIX}:stats:{name}:miss'])
+        hits = counts.get(f'{KEY_PREFIX}:stats:{name}:hit', 0)
+        misses = counts.get(f'{KEY_PREFIX}:stats:{name}:miss', 0)
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+        }
+    return stats
+
+
+def cache_response(view_method):
+    """
+    Cache the data of a successful response from a viewset method. The key
+    covers the path, the query string, the caller's role and the current
+    version of every model in the view's `cache_models`.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        view_name = type(self).__name__
+        role = getattr(request.user, 'role', None) or 'ANONYMOUS'
+        query = '&'.join(sorted(request.query_params.urlencode().split('&')))
+        versions = _model_versions(self.cache_models)
+        raw_key = f'{request.path}?{query}|{role}|{versions}'
+        key = f'{KEY_PREFIX}:{view_name}:{hashlib.md5(raw_key.encode("utf-8")).hexdigest()}'
+
+        cached = cache.get(key)
+        if cached is not None:
+            _count(view_name, 'hit')
+            return Response(cached)
+
+        _count(view_name, 'miss')
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+    return wrapper
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin that serves list/retrieve from the response cache.
+    Set `cache_models` to every model the serialized output depends on and
+    connect their post_save/post_delete signals to invalidate_model_responses.
+    Custom read-only actions opt in with the @cache_response decorator.
+    """
+    cache_models = ()
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _cached_views.add(cls.__name__)
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ResponseCacheStatsView(APIView):
+    """Hit/miss counters of the response cache per view (Admin only)"""
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response(response_cache_stats())
@@ -0,0 +1,128 @@
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def _latest(stamps):
+    stamps = [stamp for stamp in stamps if isinstance(stamp, datetime)]
+    return max(stamps) if stamps else None
+
+
+def related_rows(model, field, timestamp='updated_at'):
+    """
+    Aggregates for `etag_timestamp_fields` covering the `model` rows whose
+    `field` points at each row: their latest `timestamp` and their count, so
+    edits and deletions both change the tag. Taken as per-row subqueries, as
+    joining a to-many relation would multiply the rows being counted.
+    """
+    rows = model._default_manager.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return (
+        Max(Subquery(rows.annotate(latest=Max(timestamp)).values('latest'))),
+        Sum(Subquery(rows.annotate(rows=Count('pk')).values('rows'))),
+    )
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag (and Last-Modified on detail routes) to list and
+    retrieve, answering If-None-Match / If-Modified-Since with a 304 before
+    anything is serialized.
+
+    A list's validator covers the page actually returned: its row ids, the
+    pagination envelope (count, next/previous links) and one aggregate
+    over just those rows with the latest value of each field in
+    `etag_timestamp_fields`, so the tag costs a page-sized query rather
+    than a scan of everything the filters match. List the timestamps of
+    the model itself and of any related rows the serializer embeds (e.g.
+    'patient__user__updated_at'), so an edit to either changes the tag.
+    Entries may also be aggregate expressions, such as related_rows() for
+    reverse foreign keys.
+    """
+    etag_timestamp_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+
+        ids = [row.pk for row in rows]
+        identity = ','.join(str(pk) for pk in ids)
+        if page is not None:
+            envelope = self.get_paginated_response([]).data
+            identity += '|' + '|'.join(f'{key}={value}' for key, value in envelope.items() if key != 'results')
+        stamps = self._rows_timestamps(queryset.model, ids)
+        etag = self._make_etag(request, identity, stamps)
+
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data)
+        return self._add_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = _latest(self._object_timestamps(instance))
+        etag = self._make_etag(request, instance.pk, [last_modified])
+
+        not_modified = self._not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self._add_validators(Response(serializer.data), etag, last_modified)
+
+    def _object_timestamps(self, instance):
+        if all(isinstance(field, str) and '__' not in field for field in self.etag_timestamp_fields):
+            return [getattr(instance, field) for field in self.etag_timestamp_fields]
+        # Related timestamps come from a single aggregate instead of lazy loads
+        state = type(instance)._default_manager.filter(pk=instance.pk).aggregate(**self._etag_aggregates())
+        return list(state.values())
+
+    def _rows_timestamps(self, model, ids):
+        if not ids:
+            return []
+        state = model._default_manager.filter(pk__in=ids).aggregate(**self._etag_aggregates())
+        return list(state.values())
+
+    def _etag_aggregates(self):
+        return {f'latest_{i}': Max(field) if isinstance(field, str) else field
+                for i, field in enumerate(self.etag_timestamp_fields)}
+
+    def _make_etag(self, request, identity, stamps):
+        # Same URL for another user (or another format) must never validate
+        parts = [
+            type(self).__name__,
+            request.get_full_path(),
+            str(request.user.pk),
+            getattr(request, 'accepted_media_type', '') or '',
+            str(identity),
+        ] + [stamp.isoformat() if isinstance(stamp, datetime) else str(stamp) if stamp is not None else '-'
+             for stamp in stamps]
+        return quote_etag(hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest())
+
+    def _not_modified(self, request, etag, last_modified=None):
+        response = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if response is not None:
+            self._add_validators(response, etag, last_modified)
+        return response
+
+    def _add_validators(self, response, etag, last_modified=None):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+            # Let browsers keep the body but always revalidate it with us
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,282 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (CursorPagination, Cursor, PageNumberPagination,
+                                       _positive_int, _reverse_ordering)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_MODES = ('exact', 'estimate', 'cached', 'none')
+
+
+def _count_sql(queryset):
+    return queryset.order_by().query.sql_with_params()
+
+
+def cached_count(queryset):
+    """Exact COUNT(*), memoised for PAGINATION_COUNT_CACHE_TIMEOUT seconds per distinct query"""
+    try:
+        sql, params = _count_sql(queryset)
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.md5(f'{queryset.db}|{sql}|{params!r}'.encode('utf-8')).hexdigest()
+    key = f'pagination-count:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def estimated_count(queryset):
+    """
+    Row count from the PostgreSQL planner's estimate. Small results (below
+    PAGINATION_COUNT_ESTIMATE_THRESHOLD) are counted exactly since that is
+    cheap and estimates are least accurate there. Other databases have no
+    usable estimate, so they get a short-lived cached count instead.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return cached_count(queryset)
+    try:
+        sql, params = _count_sql(queryset)
+    except EmptyResultSet:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+
+    if estimate < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+        return queryset.count()
+    return estimate
+
+
+def count_queryset(queryset, mode):
+    if mode == 'none':
+        return None
+    if mode == 'estimate':
+        return estimated_count(queryset)
+    if mode == 'cached':
+        return cached_count(queryset)
+    return queryset.count()
+
+
+class CountModeMixin:
+    """
+    Picks how a paginator counts rows. Viewsets choose a strategy with a
+    `pagination_count_mode` attribute (one of COUNT_MODES), falling back to
+    the PAGINATION_COUNT_MODE setting; clients toggle counting with ?count=.
+    """
+    count_query_param = 'count'
+    count_by_default = True
+
+    def get_count_mode(self, request, view=None):
+        mode = getattr(view, 'pagination_count_mode', None) or settings.PAGINATION_COUNT_MODE
+        if mode not in COUNT_MODES:
+            raise ImproperlyConfigured(f"Unknown pagination count mode {mode!r}; use one of {', '.join(COUNT_MODES)}")
+
+        requested = request.query_params.get(self.count_query_param)
+        if requested is None:
+            wanted = self.count_by_default
+        else:
+            wanted = requested.lower() not in ('0', 'false', 'no', 'off')
+        return mode if wanted else 'none'
+
+
+class CountedPageNumberPagination(CountModeMixin, PageNumberPagination):
+    """
+    Page number pagination that never depends on an exact COUNT(*).
+
+    Whether a next page exists is decided by fetching one extra row, so the
+    reported `count` is informational only: exact, planner-estimated or
+    cached depending on the count mode, and omitted with ?count=false.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.page_size = page_size
+        count_mode = self.get_count_mode(request, view)
+        self.count = None
+
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            # Estimated or cached counts could point past the end or short of it
+            self.count = count_queryset(queryset, 'exact')
+            page_number = max(1, -(-self.count // page_size))
+        try:
+            self.page_number = _positive_int(page_number, strict=True)
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='That page number is not an integer'
+            ))
+
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and self.page_number != 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='That page contains no results'
+            ))
+
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        if self.count is None:
+            self.count = count_queryset(queryset, count_mode)
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+
+class KeysetCursorPagination(CountModeMixin, CursorPagination):
+    """
+    Cursor pagination over a composite sort key.
+
+    DRF's CursorPagination only positions on the first ordering field and
+    falls back to an OFFSET for ties, which degrades on columns like
+    appointment_date where many rows share a value. Here the cursor holds
+    the full ordering tuple (always ending in the primary key), so every
+    page is a single indexed range scan no matter how deep it is.
+
+    Responses carry no total unless the client asks for one with ?count=true.
+    """
+    page_size_query_param = 'page_size'
+    count_by_default = False
+    max_page_size = settings.MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        # A unique trailing key makes every position unambiguous
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        self.count = count_queryset(queryset, self.get_count_mode(request, view))
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, position))
+
+        # Fetch one extra row to know whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _keyset_filter(self, ordering, position):
+        """Rows strictly after `position` in `ordering`, as a lexicographic tuple comparison"""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal_prefix = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data = OrderedDict([('count', self.count)] + list(response.data.items()))
+        return response
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return json.dumps(values, default=str, separators=(',', ':'))
+
+
+class AppointmentCursorPagination(KeysetCursorPagination):
+    ordering = ('-appointment_date', '-appointment_time', '-id')
+
+
+class CreatedAtCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-id')
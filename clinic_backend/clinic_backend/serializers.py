@@ -0,0 +1,183 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _split_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return set()
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Lets API clients shape read responses with query parameters:
+
+        ?fields=id,user_name   only return these fields
+        ?omit=user_details     drop these fields
+        ?expand=doctor         render a related id as its nested object
+
+    Expandable relations are declared in Meta.expandable_fields as
+    {field_name: 'dotted.path.to.Serializer'}. Related paths read by
+    SerializerMethodFields are declared in Meta.field_relations so that
+    optimize_queryset can join or prefetch them.
+
+    Only the top-level serializer of a GET request is reshaped; nested
+    uses and writes always see the full field set.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_root():
+            return fields
+
+        wanted = _split_param(request, 'fields')
+        omitted = _split_param(request, 'omit')
+        expanded = _split_param(request, 'expand')
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expanded & set(expandable):
+            source = fields[name].source if name in fields else name
+            serializer_class = import_string(expandable[name])
+            fields[name] = serializer_class(source=None if source == name else source, read_only=True)
+
+        for name in list(fields):
+            if (wanted and name not in wanted and name not in expanded) or name in omitted:
+                fields.pop(name)
+        return fields
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def _walk_relations(model, attrs):
+    """
+    Follow `attrs` through model relations. Returns the relation path that was
+    crossed, the model it ends on, and whether a to-many relation was crossed
+    (which can only be prefetched, not joined).
+    """
+    path = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation:
+            break
+        path.append(attr)
+        model = field.related_model
+        if field.many_to_many or field.one_to_many:
+            return path, model, True
+    return path, model, False
+
+
+def _collect_relations(serializer, model, prefix, select, prefetch):
+    relations = getattr(getattr(serializer, 'Meta', None), 'field_relations', {})
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        for lookup in relations.get(name, ()):
+            if isinstance(lookup, Prefetch):
+                prefetch.add(Prefetch(
+                    prefix + lookup.prefetch_through,
+                    queryset=lookup.queryset,
+                    to_attr=lookup.to_attr,
+                ))
+                continue
+            path, _, to_many = _walk_relations(model, lookup.split('__'))
+            if path:
+                (prefetch if to_many else select).add(prefix + '__'.join(path))
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField) or field.source == '*':
+            # Primary keys are read from the local *_id column
+            continue
+
+        path, related_model, to_many = _walk_relations(model, field.source_attrs)
+        if not path:
+            continue
+        lookup = prefix + '__'.join(path)
+        (prefetch if to_many else select).add(lookup)
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            nested_select = set()
+            _collect_relations(nested, related_model, lookup + '__', nested_select, prefetch)
+            (prefetch if to_many else select).update(nested_select)
+
+
+def _lookup_path(lookup):
+    return lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+
+
+def _select_paths(tree, prefix=''):
+    """Leaf lookups of a query's nested select_related dict"""
+    for name, subtree in tree.items():
+        if subtree:
+            yield from _select_paths(subtree, prefix + name + '__')
+        else:
+            yield prefix + name
+
+
+def _drop_relations(queryset, stale):
+    """Remove the view's joins and prefetches whose lookup is in `stale`, keeping the rest"""
+    selected = queryset.query.select_related
+    prefetched = [lookup for lookup in queryset._prefetch_related_lookups if _lookup_path(lookup) not in stale]
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if selected is True:
+        queryset = queryset.select_related()
+    elif selected:
+        kept = [path for path in _select_paths(selected) if path not in stale]
+        if kept:
+            queryset = queryset.select_related(*kept)
+    if prefetched:
+        queryset = queryset.prefetch_related(*prefetched)
+    return queryset
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Add select_related/prefetch_related for exactly the relations the
+    serializer will render. When the client asked for a sparse fieldset,
+    joins the view added up front for fields that are no longer rendered
+    are dropped first, so lean requests also run leaner SQL. Relations the
+    serializer does not declare are kept, as the view may need them.
+    """
+    select = set()
+    lookups = set()
+    _collect_relations(serializer, queryset.model, '', select, lookups)
+    prefetch = sorted(lookup for lookup in lookups if isinstance(lookup, str))
+    prefetch += [lookup for lookup in lookups if isinstance(lookup, Prefetch)]
+
+    request = serializer.context.get('request')
+    if request is not None and (_split_param(request, 'fields') or _split_param(request, 'omit')):
+        # Without a request the serializer renders its full field set
+        full = type(serializer)(context={key: value for key, value in serializer.context.items() if key != 'request'})
+        declared = set()
+        _collect_relations(full, queryset.model, '', declared, declared)
+        needed = select | {_lookup_path(lookup) for lookup in lookups}
+        queryset = _drop_relations(queryset, {_lookup_path(lookup) for lookup in declared} - needed)
+
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class OptimizedQuerysetMixin:
+    """ViewSet mixin that shapes read querysets to the serializer's requested fields"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
@@ -2,6 +2,7 @@ from pathlib import Path
 from datetime import timedelta
 import os
 from decouple import config
+from django.conf import global_settings
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -34,6 +35,7 @@ INSTALLED_APPS = [
     'billing',
     'support',
     'beds',
+    'autocomplete',
 ]
 
 MIDDLEWARE = [
@@ -104,6 +106,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'accounts.User'
 
 # Authentication Backends
+# New and upgraded password hashes use PASSWORD_HASHER; the other Django hashers stay
+# listed so existing hashes still verify and are re-hashed on the next successful login
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='django.contrib.auth.hashers.PBKDF2PasswordHasher')
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher for hasher in global_settings.PASSWORD_HASHERS if hasher != PASSWORD_HASHER
+]
+
+# Request threads per web process; the Procfile passes the same value to gunicorn --threads
+WEB_THREADS = config('WEB_THREADS', default=8, cast=int)
+
+# Password hashing runs on a small per-process pool; requests beyond the pool plus
+# queue depth (or waiting longer than the timeout) get a 503 with Retry-After.
+# Admission is capped below WEB_THREADS so logins can never occupy every request thread
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=2, cast=int)
+PASSWORD_HASH_QUEUE_DEPTH = config('PASSWORD_HASH_QUEUE_DEPTH', default=2, cast=int)
+PASSWORD_HASH_TIMEOUT = config('PASSWORD_HASH_TIMEOUT', default=5, cast=float)
+PASSWORD_HASH_RETRY_AFTER = config('PASSWORD_HASH_RETRY_AFTER', default=2, cast=int)
+
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
@@ -111,15 +131,75 @@ AUTHENTICATION_BACKENDS = [
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'clinic_backend.pagination.CountedPageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
+# Upper bound for the ?page_size= parameter on paginated lists
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=100, cast=int)
+
+# How paginated lists count rows: exact, estimate (planner estimate on PostgreSQL,
+# cached count elsewhere), cached or none. Viewsets may override via pagination_count_mode.
+PAGINATION_COUNT_MODE = config('PAGINATION_COUNT_MODE', default='estimate')
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = config('PAGINATION_COUNT_ESTIMATE_THRESHOLD', default=10000, cast=int)
+PAGINATION_COUNT_CACHE_TIMEOUT = config('PAGINATION_COUNT_CACHE_TIMEOUT', default=30, cast=int)
+
+# Cache backend; local memory unless CACHE_BACKEND/CACHE_LOCATION point elsewhere (e.g. Redis)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='clinic-backend'),
+    }
+}
+
+# Lifetime of cached read-only API responses (seconds); model signals invalidate them sooner
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60 * 10, cast=int)
+
+# Authenticated users are cached per worker process for this long (seconds);
+# saving a user invalidates their entry straight away
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+AUTH_USER_CACHE_MAX_ENTRIES = config('AUTH_USER_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# Let read-only views that opt in authorize from signed token claims alone, without
+# loading the user. Revocations live in the cache, so this requires a shared backend
+# (startup fails with the per-process local-memory default).
+AUTH_STATELESS_CLAIMS = config('AUTH_STATELESS_CLAIMS', default=False, cast=bool)
+
+# Patient ?search= returns at most this many best-ranked matches
+PATIENT_SEARCH_MAX_RESULTS = config('PATIENT_SEARCH_MAX_RESULTS', default=200, cast=int)
+
+# Prescription full-text search ranks only this many of the newest matches
+PRESCRIPTION_SEARCH_MAX_CANDIDATES = config('PRESCRIPTION_SEARCH_MAX_CANDIDATES', default=5000, cast=int)
+
+# The in-memory autocomplete index is patched by model signals in the process that
+# made the change; every process also rebuilds it from the database after this many seconds
+AUTOCOMPLETE_MAX_AGE = config('AUTOCOMPLETE_MAX_AGE', default=60 * 15, cast=int)
+AUTOCOMPLETE_MAX_LIMIT = config('AUTOCOMPLETE_MAX_LIMIT', default=25, cast=int)
+
+# Bed board stream: bed changes are published to an in-process buffer of this many
+# events, so a stream only sees changes made by its own process (run the board on one
+# threaded worker, or let clients fall back to the snapshot sent on reconnect)
+BED_BOARD_BUFFER_SIZE = config('BED_BOARD_BUFFER_SIZE', default=1000, cast=int)
+# Each open stream occupies a worker thread (the Procfile runs gthread workers for this).
+# Streams end after this many seconds and the client reconnects from its last event;
+# keep it below gunicorn's worker timeout (30s) so a sync worker would not be killed mid-stream
+BED_BOARD_STREAM_SECONDS = config('BED_BOARD_STREAM_SECONDS', default=25, cast=int)
+BED_BOARD_HEARTBEAT_SECONDS = config('BED_BOARD_HEARTBEAT_SECONDS', default=10, cast=int)
+# Open streams per process; more get a 503 asking them to retry after BED_BOARD_RETRY_AFTER
+# seconds. Keep it well below WEB_THREADS so boards never starve the rest of the API
+BED_BOARD_MAX_STREAMS = config('BED_BOARD_MAX_STREAMS', default=2, cast=int)
+BED_BOARD_RETRY_AFTER = config('BED_BOARD_RETRY_AFTER', default=5, cast=int)
+
+# Appointments are booked on this grid inside a doctor's slot windows, each taking this long
+APPOINTMENT_SLOT_MINUTES = config('APPOINTMENT_SLOT_MINUTES', default=15, cast=int)
+# Per-doctor free intervals behind next-available search; bookings and slot edits drop them sooner
+SCHEDULE_CACHE_SECONDS = config('SCHEDULE_CACHE_SECONDS', default=60, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=5),
@@ -131,6 +211,7 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.tokens.ClaimsTokenObtainPairSerializer',
 }
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -171,4 +252,6 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@clinicmanagem
 PASSWORD_RESET_TOKEN_EXPIRATION_HOURS = config('PASSWORD_RESET_TOKEN_EXPIRATION_HOURS', default=24, cast=int)
 
 # Frontend URL for password reset link
-FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
\ No newline at end of file
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
+# Rendered invoice documents are cached per invoice revision (seconds)
+INVOICE_CACHE_TIMEOUT = config('INVOICE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
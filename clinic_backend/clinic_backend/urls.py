@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from clinic_backend.cache import ResponseCacheStatsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,4 +15,6 @@ urlpatterns = [
     path('api/billing/', include('billing.urls')),
     path('api/support/', include('support.urls')),
     path('api/beds/', include('beds.urls')),
+    path('api/autocomplete/', include('autocomplete.urls')),
+    path('api/cache/stats/', ResponseCacheStatsView.as_view(), name='response_cache_stats'),
 ]
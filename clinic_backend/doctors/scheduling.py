@@ -0,0 +1,252 @@
+# doctors/scheduling.py
+
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DoctorSlot
+
+WEEKDAYS = [code for code, _ in DoctorSlot.WEEKDAY_CHOICES]  # Monday first, as date.weekday()
+# Bookings in these states hold their time
+BOOKED_STATUSES = ('PENDING', 'APPROVED', 'VISITED')
+MAX_DAYS = 60
+
+
+def _cache_key(doctor_id):
+    return f'doctors:free-intervals:{doctor_id}'
+
+
+def invalidate_free_intervals(doctor_id):
+    cache.delete(_cache_key(doctor_id))
+
+
+def _merge(windows):
+    """Sorted, non-overlapping [start, end) from possibly overlapping windows"""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _build_free_intervals(doctor_ids, first_day, days):
+    """
+    {doctor id: [(start, end), ...]} of bookable time from `first_day` on:
+    each day's active slot windows minus the booked appointments. Starts
+    are snapped up to the window's grid of APPOINTMENT_SLOT_MINUTES, so
+    every interval begins at a bookable time. Two queries for all doctors.
+    """
+    from appointments.models import Appointment
+
+    length = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    last_day = first_day + timedelta(days=days - 1)
+
+    windows = defaultdict(lambda: defaultdict(list))
+    rows = (DoctorSlot.objects.filter(doctor_id__in=doctor_ids, is_active=True)
+            .values_list('doctor_id', 'weekday', 'start_time', 'end_time'))
+    for doctor_id, weekday, start_time, end_time in rows:
+        windows[doctor_id][weekday].append((start_time, end_time))
+
+    booked = defaultdict(list)
+    rows = (Appointment.objects
+            .filter(doctor_id__in=doctor_ids, appointment_date__gte=first_day, appointment_date__lte=last_day,
+                    status__in=BOOKED_STATUSES)
+            .values_list('doctor_id', 'appointment_date', 'appointment_time'))
+    for doctor_id, day, time in rows:
+        start = datetime.combine(day, time)
+        booked[doctor_id].append((start, start + length))
+
+    free = {}
+    for doctor_id in doctor_ids:
+        taken = sorted(booked[doctor_id])
+        intervals = []
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            for window_start, window_end in _merge(
+                    (datetime.combine(day, start), datetime.combine(day, end))
+                    for start, end in windows[doctor_id].get(WEEKDAYS[day.weekday()], ())):
+                gaps, cursor = [], window_start
+                # Walk the bookings overlapping this window, keeping the gaps
+                for booked_start, booked_end in taken[bisect_left(taken, (window_start - length,)):]:
+                    if booked_start >= window_end:
+                        break
+                    if booked_end > cursor:
+                        gaps.append((cursor, booked_start))
+                        cursor = booked_end
+                gaps.append((cursor, window_end))
+                # Snap starts onto the window's grid and drop gaps too short to book
+                for start, end in gaps:
+                    start = window_start + -(-(start - window_start) // length) * length
+                    if start + length <= end:
+                        intervals.append((start, end))
+        free[doctor_id] = intervals
+    return free
+
+
+def free_intervals(doctor_ids, first_day, days):
+    """
+    Free intervals per doctor, from a short-lived cache entry per doctor.
+    Entries are rebuilt for a new day or a longer horizon, expire after
+    SCHEDULE_CACHE_SECONDS and are dropped when the doctor's slots or
+    appointments change.
+    """
+    cached = cache.get_many([_cache_key(doctor_id) for doctor_id in doctor_ids])
+    free, stale = {}, []
+    for doctor_id in doctor_ids:
+        entry = cached.get(_cache_key(doctor_id))
+        if entry and entry[0] == first_day and entry[1] >= days:
+            free[doctor_id] = entry[2]
+        else:
+            stale.append(doctor_id)
+    if stale:
+        built = _build_free_intervals(stale, first_day, days)
+        cache.set_many({_cache_key(doctor_id): (first_day, days, intervals)
+                        for doctor_id, intervals in built.items()}, settings.SCHEDULE_CACHE_SECONDS)
+        free.update(built)
+    return free
+
+
+def _slot_starts(doctor_id, intervals, after):
+    length = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    for start, end in intervals:
+        if end <= after:
+            continue
+        if start < after:
+            # Move up to the first grid point not in the past
+            start += -(-(after - start) // length) * length
+        while start + length <= end:
+            yield start, doctor_id
+            start += length
+
+
+def next_available_slots(doctor_ids, limit=10, days=14):
+    """
+    The earliest `limit` bookable (start, doctor id) slots across
+    `doctor_ids` within `days` days from now. Each doctor's free slots form a sorted stream and
+    heapq.merge interleaves them lazily, so only the first `limit` are
+    ever generated however many doctors and days are searched.
+    """
+    now = timezone.localtime().replace(tzinfo=None)
+    free = free_intervals(doctor_ids, now.date(), days)
+    streams = [_slot_starts(doctor_id, free[doctor_id], now) for doctor_id in doctor_ids]
+    # A cached entry may cover more days than asked for
+    horizon = datetime.combine(now.date() + timedelta(days=days), datetime.min.time())
+    return [slot for slot in islice(heapq.merge(*streams), limit) if slot[0] < horizon]
+
+
+class IntervalTree:
+    """
+    Static centred interval tree over half-open [start, end) intervals.
+
+    Built once from a list: each node takes the median start, keeps the
+    intervals containing that point (sorted both by start and by end) and
+    passes the rest to the side they lie on. A stabbing or overlap query
+    visits one root-to-leaf path plus the intervals it reports, so
+    checking n intervals against each other is O(n log n + overlaps).
+    """
+
+    def __init__(self, intervals):
+        """`intervals`: [(start, end, key), ...]"""
+        self.root = self._build(list(intervals))
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        points = sorted(start for start, _, _ in intervals)
+        center = points[len(points) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] <= center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        return {
+            'center': center,
+            'by_start': sorted(here),
+            'by_end': sorted(here, key=lambda interval: interval[1], reverse=True),
+            'left': self._build(left),
+            'right': self._build(right),
+        }
+
+    def overlapping(self, start, end):
+        """Keys of the stored intervals that overlap [start, end)"""
+        found = []
+        self._query(self.root, start, end, found)
+        return found
+
+    def _query(self, node, start, end, found):
+        while node is not None:
+            if end <= node['center']:
+                # Intervals here reach the query only if they start before its end
+                for interval in node['by_start']:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval[2])
+                node = node['left']
+            elif start > node['center']:
+                # ...or end after its start
+                for interval in node['by_end']:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval[2])
+                node = node['right']
+            else:
+                # The query covers the centre, so it overlaps everything here
+                found.extend(interval[2] for interval in node['by_start'])
+                self._query(node['left'], start, end, found)
+                node = node['right']
+
+
+def find_overlaps(slots):
+    """
+    Overlapping pairs among `slots` ([(doctor, weekday, start, end), ...]),
+    as index pairs (i, j) with i < j, using one IntervalTree per
+    (doctor, weekday).
+    """
+    groups = defaultdict(list)
+    for index, (doctor_id, weekday, start, end) in enumerate(slots):
+        groups[(doctor_id, weekday)].append((start, end, index))
+
+    overlaps = []
+    for intervals in groups.values():
+        if len(intervals) < 2:
+            continue
+        tree = IntervalTree(intervals)
+        for start, end, index in intervals:
+            overlaps.extend((index, other) for other in sorted(tree.overlapping(start, end)) if other > index)
+    return overlaps
+
+
+def replace_weekly_schedules(templates):
+    """
+    Replace every slot of each doctor in `templates` ({doctor id: [slot
+    dicts]}) with the given week, in one transaction: one delete, one
+    bulk insert. bulk_create skips model signals, so the cached doctor
+    responses and free intervals are dropped on commit here.
+    Returns (number of slots deleted, created slots).
+    """
+    from clinic_backend.cache import invalidate_model_responses
+
+    with transaction.atomic():
+        deleted, _ = DoctorSlot.objects.filter(doctor_id__in=templates).delete()
+        created = DoctorSlot.objects.bulk_create(
+            DoctorSlot(doctor_id=doctor_id, **slot) for doctor_id, slots in templates.items() for slot in slots
+        )
+
+        def invalidate():
+            invalidate_model_responses(DoctorSlot)
+            for doctor_id in templates:
+                invalidate_free_intervals(doctor_id)
+        transaction.on_commit(invalidate)
+    return deleted, created
@@ -1,14 +1,15 @@
 from rest_framework import serializers
 from .models import Department, Doctor, DoctorSlot
 from accounts.serializers import UserSerializer
+from clinic_backend.serializers import DynamicFieldsMixin
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Department
         fields = '__all__'
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = serializers.IntegerField(write_only=True, required=True)
     user_details = UserSerializer(source='user', read_only=True)
     department_name = serializers.CharField(source='department.name', read_only=True)
@@ -21,6 +22,7 @@ class DoctorSerializer(serializers.ModelSerializer):
                   'specialization', 'qualification', 'experience_years', 'consultation_fee', 
                   'license_number', 'bio', 'is_available', 'created_at', 'updated_at']
         read_only_fields = ['user_details', 'user_name', 'user_email', 'department_name', 'created_at', 'updated_at']
+        expandable_fields = {'department': 'doctors.serializers.DepartmentSerializer'}
     
     def create(self, validated_data):
         user_id = validated_data.pop('user', None)
@@ -47,15 +49,74 @@ class DoctorSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Override to_representation to include user object for read operations"""
         ret = super().to_representation(instance)
-        if instance and hasattr(instance, 'user'):
-            ret['user'] = instance.user.id
+        if instance and 'user' in self.fields:
+            ret['user'] = instance.user_id
         return ret
 
 
-class DoctorSlotSerializer(serializers.ModelSerializer):
+class DoctorSlotSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     doctor_name = serializers.CharField(source='doctor.user.full_name', read_only=True)
     
     class Meta:
         model = DoctorSlot
         fields = '__all__'
-        read_only_fields = ['created_at']
\ No newline at end of file
+        read_only_fields = ['created_at']
+        expandable_fields = {'doctor': 'doctors.serializers.DoctorSerializer'}
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        doctor = attrs.get('doctor', getattr(self.instance, 'doctor', None))
+        weekday = attrs.get('weekday', getattr(self.instance, 'weekday', None))
+        start_time = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time >= end_time:
+            raise serializers.ValidationError({'end_time': 'End time must be after start time'})
+        # Touching windows are fine; any shared minute is not
+        clashes = DoctorSlot.objects.filter(doctor=doctor, weekday=weekday,
+                                            start_time__lt=end_time, end_time__gt=start_time)
+        if self.instance is not None:
+            clashes = clashes.exclude(pk=self.instance.pk)
+        clash = clashes.order_by('start_time').first()
+        if clash:
+            raise serializers.ValidationError(
+                f'Overlaps the {clash.weekday} slot {clash.start_time:%H:%M}-{clash.end_time:%H:%M}')
+        return attrs
+
+
+class ScheduleSlotSerializer(serializers.Serializer):
+    weekday = serializers.ChoiceField(choices=DoctorSlot.WEEKDAY_CHOICES)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    is_active = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError({'end_time': 'End time must be after start time'})
+        return attrs
+
+
+class DoctorScheduleSerializer(serializers.Serializer):
+    """One doctor's whole weekly template; an empty list clears it"""
+    doctor = serializers.IntegerField(min_value=1)
+    slots = ScheduleSlotSerializer(many=True, allow_empty=True)
+
+
+class BulkScheduleSerializer(serializers.Serializer):
+    schedules = DoctorScheduleSerializer(many=True, allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def to_internal_value(self, data):
+        # A single doctor's template can be posted on its own
+        if isinstance(data, dict) and 'schedules' not in data and 'doctor' in data:
+            data = {'schedules': [{'doctor': data.get('doctor'), 'slots': data.get('slots')}],
+                    'dry_run': data.get('dry_run', False)}
+        return super().to_internal_value(data)
+
+    def validate_schedules(self, schedules):
+        doctors = [schedule['doctor'] for schedule in schedules]
+        if len(doctors) != len(set(doctors)):
+            raise serializers.ValidationError('Each doctor may appear only once')
+        missing = set(doctors) - set(Doctor.objects.filter(id__in=doctors).values_list('id', flat=True))
+        if missing:
+            raise serializers.ValidationError(f'Unknown doctor ids: {sorted(missing)}')
+        return schedules
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from accounts.models import User
+from clinic_backend.cache import invalidate_model_responses
+from appointments.models import Appointment
+from .models import Department, Doctor, DoctorSlot
+from .scheduling import invalidate_free_intervals
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_save, sender=DoctorSlot)
+@receiver(post_delete, sender=DoctorSlot)
+def invalidate_doctor_responses(sender, **kwargs):
+    """Drop cached department/doctor/slot responses when their data changes"""
+    invalidate_model_responses(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_doctor_user_responses(sender, instance, **kwargs):
+    """Doctor responses show the doctor's name, email and phone from the user row"""
+    if instance.role == 'DOCTOR':
+        invalidate_model_responses(User)
+
+
+@receiver(pre_save, sender=DoctorSlot)
+def remember_slot_doctor(sender, instance, raw=False, **kwargs):
+    """Note the stored doctor so a slot moved to another doctor also frees the old one"""
+    instance._previous_doctor_id = None
+    if instance.pk and not raw:
+        instance._previous_doctor_id = (DoctorSlot.objects.filter(pk=instance.pk)
+                                        .values_list('doctor_id', flat=True).first())
+
+
+@receiver(post_save, sender=DoctorSlot)
+@receiver(post_delete, sender=DoctorSlot)
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_doctor_free_intervals(sender, instance, **kwargs):
+    """Slot edits and bookings change when the doctor is free, for the old doctor too if it moved"""
+    if sender is Appointment:
+        # Recorded by the appointments app's pre_save handler
+        previous = (getattr(instance, '_previous_pair', None) or (None,))[0]
+    else:
+        previous = getattr(instance, '_previous_doctor_id', None)
+    if previous is not None and previous != instance.doctor_id:
+        invalidate_free_intervals(previous)
+    invalidate_free_intervals(instance.doctor_id)
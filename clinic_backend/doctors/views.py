@@ -3,13 +3,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Department, Doctor, DoctorSlot
-from .serializers import DepartmentSerializer, DoctorSerializer, DoctorSlotSerializer
+from .serializers import BulkScheduleSerializer, DepartmentSerializer, DoctorSerializer, DoctorSlotSerializer
+from .scheduling import MAX_DAYS, find_overlaps, next_available_slots, replace_weekly_schedules
 from accounts.permissions import IsAdminOrStaff, IsDoctor
+from clinic_backend.cache import CachedResponseMixin, cache_response
+from clinic_backend.serializers import OptimizedQuerysetMixin
+from accounts.models import User
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(CachedResponseMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated]
+    cache_models = (Department,)
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -17,13 +22,15 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         return [IsAdminOrStaff()]
 
 
-class DoctorViewSet(viewsets.ModelViewSet):
+class DoctorViewSet(CachedResponseMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Doctor.objects.all()
     serializer_class = DoctorSerializer
     permission_classes = [IsAuthenticated]
+    # Doctor payloads embed the department name and the doctor's user details
+    cache_models = (Doctor, DoctorSlot, Department, User)
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'available_doctors', 'available_slots']:
+        if self.action in ['list', 'retrieve', 'available_doctors', 'available_slots', 'next_available']:
             return [IsAuthenticated()]
         return [IsAdminOrStaff()]
     
@@ -32,6 +39,7 @@ class DoctorViewSet(viewsets.ModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def available_doctors(self, request):
         """Get list of available doctors"""
         doctors = Doctor.objects.filter(is_available=True).select_related('user', 'department')
@@ -39,6 +47,7 @@ class DoctorViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def available_slots(self, request, pk=None):
         """Get available (active) slots for a specific doctor"""
         doctor = self.get_object()
@@ -46,6 +55,44 @@ class DoctorViewSet(viewsets.ModelViewSet):
         serializer = DoctorSlotSerializer(slots, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def next_available(self, request):
+        """
+        Earliest open appointment slots across the available doctors of
+        ?department_id= or ?specialization=, up to ?limit= (10) within ?days= (14)
+        """
+        params = request.query_params
+        try:
+            limit = min(int(params.get('limit') or 10), 50)
+            days = min(int(params.get('days') or 14), MAX_DAYS)
+            department_id = int(params['department_id']) if params.get('department_id') else None
+        except ValueError:
+            return Response({'error': 'limit, days and department_id must be integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or days < 1:
+            return Response({'error': 'limit and days must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+
+        doctors = Doctor.objects.filter(is_available=True)
+        if department_id is not None:
+            doctors = doctors.filter(department_id=department_id)
+        elif params.get('specialization'):
+            doctors = doctors.filter(specialization__iexact=params['specialization'].strip())
+        else:
+            return Response({'error': 'department_id or specialization is required'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        doctors = {doctor['id']: doctor for doctor in doctors.values(
+            'id', 'user__full_name', 'specialization', 'consultation_fee')}
+        slots = next_available_slots(list(doctors), limit=limit, days=days)
+        return Response([{
+            'doctor': doctor_id,
+            'doctor_name': doctors[doctor_id]['user__full_name'],
+            'specialization': doctors[doctor_id]['specialization'],
+            'consultation_fee': doctors[doctor_id]['consultation_fee'],
+            'date': start.date(),
+            'time': start.time(),
+        } for start, doctor_id in slots])
+
     @action(detail=True, methods=['get'])
     def all_slots(self, request, pk=None):
         """Get all slots (active and inactive) for a specific doctor"""
@@ -55,7 +102,7 @@ class DoctorViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class DoctorSlotViewSet(viewsets.ModelViewSet):
+class DoctorSlotViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = DoctorSlotSerializer
     permission_classes = [IsAuthenticated]
     
@@ -68,4 +115,47 @@ class DoctorSlotViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.role == 'DOCTOR':
             return DoctorSlot.objects.filter(doctor__user=user).order_by('weekday', 'start_time')
-        return DoctorSlot.objects.all().order_by('weekday', 'start_time')
\ No newline at end of file
+        return DoctorSlot.objects.all().order_by('weekday', 'start_time')
+
+    @action(detail=False, methods=['post'])
+    def bulk_replace(self, request):
+        """
+        Replace whole weekly templates: {"schedules": [{"doctor": id, "slots":
+        [{weekday, start_time, end_time, is_active}]}], "dry_run": false}, or
+        one {"doctor", "slots"}. Every listed doctor's existing slots are
+        swapped for the new ones in one transaction; nothing is written if
+        any two windows on the same day overlap.
+        """
+        serializer = BulkScheduleSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        schedules = serializer.validated_data['schedules']
+
+        flat = [(schedule['doctor'], slot) for schedule in schedules for slot in schedule['slots']]
+        overlaps = find_overlaps([(doctor_id, slot['weekday'], slot['start_time'], slot['end_time'])
+                                  for doctor_id, slot in flat])
+        if overlaps:
+            return Response({
+                'error': 'Schedule has overlapping slots',
+                'conflicts': [
+                    {'doctor': flat[i][0], 'weekday': flat[i][1]['weekday'],
+                     'slots': [{'start_time': flat[index][1]['start_time'], 'end_time': flat[index][1]['end_time']}
+                               for index in (i, j)]}
+                    for i, j in overlaps
+                ],
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if serializer.validated_data['dry_run']:
+            return Response({'doctors': len(schedules), 'slots': len(flat), 'dry_run': True})
+
+        deleted, created = replace_weekly_schedules({
+            schedule['doctor']: schedule['slots'] for schedule in schedules
+        })
+        slots = (DoctorSlot.objects.filter(doctor_id__in=[schedule['doctor'] for schedule in schedules])
+                 .select_related('doctor__user').order_by('doctor_id', 'weekday', 'start_time'))
+        return Response({
+            'doctors': len(schedules),
+            'deleted': deleted,
+            'created': len(created),
+            'slots': DoctorSlotSerializer(slots, many=True).data,
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from patients.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the patient search token index from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tokens per bulk insert')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} patients'))
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:18
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of patients.search.patient_tokens as of this migration, so later
+# tokenizer changes don't alter what it does; rebuild_patient_search re-tokenizes
+_SOUNDEX_CODES = {letter: digit for letters, digit in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'),
+                                                       ('l', '4'), ('mn', '5'), ('r', '6'))
+                  for letter in letters}
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+def _soundex(word):
+    letters = [char for char in word if char.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0]
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+        if char not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def _patient_tokens(first_name, last_name, phone, uhid):
+    tokens = set()
+    for part in re.split(r'\s+', f'{first_name} {last_name}'):
+        word = _normalize(part)
+        if not word:
+            continue
+        tokens.add(('NAME', word))
+        tokens.add(('PHONETIC', _soundex(word)))
+        padded = f'  {word} '
+        tokens.update(('TRIGRAM', padded[i:i + 3]) for i in range(len(padded) - 2))
+
+    digits = re.sub(r'\D', '', phone or '')
+    if digits:
+        tokens.add(('PHONE', digits))
+        tokens.add(('PHONE', digits[-10:]))
+        tokens.add(('PHONE_SUFFIX', digits[::-1]))
+
+    if uhid:
+        tokens.add(('UHID', _normalize(uhid)))
+        sequence = uhid.rsplit('-', 1)[-1]
+        if sequence.isdigit():
+            tokens.add(('UHID', sequence.lstrip('0') or '0'))
+    return {(kind, token[:40]) for kind, token in tokens if token}
+
+
+def build_search_tokens(apps, schema_editor):
+    Patient = apps.get_model('patients', 'Patient')
+    PatientSearchToken = apps.get_model('patients', 'PatientSearchToken')
+    batch = []
+    patients = Patient.objects.values_list('id', 'user__first_name', 'user__last_name', 'user__phone', 'uhid')
+    for patient_id, first_name, last_name, phone, uhid in patients.iterator(chunk_size=2000):
+        batch.extend(
+            PatientSearchToken(patient_id=patient_id, kind=kind, token=token)
+            for kind, token in _patient_tokens(first_name, last_name, phone, uhid)
+        )
+        if len(batch) >= 5000:
+            PatientSearchToken.objects.bulk_create(batch)
+            batch = []
+    PatientSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0004_remove_patient_profile_completed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('NAME', 'Name'), ('PHONETIC', 'Phonetic code'), ('TRIGRAM', 'Name trigram'), ('PHONE', 'Phone'), ('PHONE_SUFFIX', 'Phone (reversed)'), ('UHID', 'UHID')], max_length=12)),
+                ('token', models.CharField(max_length=40)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='patients.patient')),
+            ],
+            options={
+                'db_table': 'patient_search_tokens',
+                'indexes': [models.Index(fields=['kind', 'token', 'patient'], name='patient_search_token_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_tokens, migrations.RunPython.noop),
+    ]
@@ -47,4 +47,33 @@ class Patient(models.Model):
                 new_seq += 1
                 self.uhid = f'HMS-{year}-{new_seq:06d}'
                 
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class PatientSearchToken(models.Model):
+    """
+    Normalized search keys of a patient (name words, phonetic codes, name
+    trigrams, phone numbers and UHID forms), maintained by patients.signals.
+    One (kind, token) index serves exact, prefix and fuzzy lookups.
+    """
+    KIND_CHOICES = [
+        ('NAME', 'Name'),
+        ('PHONETIC', 'Phonetic code'),
+        ('TRIGRAM', 'Name trigram'),
+        ('PHONE', 'Phone'),
+        ('PHONE_SUFFIX', 'Phone (reversed)'),
+        ('UHID', 'UHID'),
+    ]
+
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='search_tokens')
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    token = models.CharField(max_length=40)
+
+    class Meta:
+        db_table = 'patient_search_tokens'
+        indexes = [
+            models.Index(fields=['kind', 'token', 'patient'], name='patient_search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.token}"
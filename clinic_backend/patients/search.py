@@ -0,0 +1,225 @@
+# patients/search.py
+
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.filters import BaseFilterBackend
+
+NAME, PHONE, PHONE_SUFFIX, UHID, PHONETIC, TRIGRAM = 'NAME', 'PHONE', 'PHONE_SUFFIX', 'UHID', 'PHONETIC', 'TRIGRAM'
+
+MAX_TOKEN_LENGTH = 40
+
+_SOUNDEX_CODES = {}
+for _letters, _digit in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'), ('l', '4'), ('mn', '5'), ('r', '6')):
+    for _letter in _letters:
+        _SOUNDEX_CODES[_letter] = _digit
+
+
+def normalize(text):
+    """Lowercase ASCII letters and digits only, accents folded ('José-Luis' -> 'joseluis')"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+def words(text):
+    return [word for word in (normalize(part) for part in re.split(r'\s+', text or '')) if word]
+
+
+def soundex(word):
+    """American Soundex, so 'Smith'/'Smyth' and 'Mehta'/'Meta' share a code"""
+    letters = [char for char in word if char.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0]
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+        if char not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _digits(text):
+    return re.sub(r'\D', '', text or '')
+
+
+def patient_tokens(first_name, last_name, phone, uhid):
+    """All (kind, token) pairs a patient is findable by"""
+    tokens = set()
+    for word in words(f'{first_name} {last_name}'):
+        tokens.add((NAME, word))
+        tokens.add((PHONETIC, soundex(word)))
+        tokens.update((TRIGRAM, trigram) for trigram in trigrams(word))
+
+    digits = _digits(phone)
+    if digits:
+        # Full number, number without country code, and reversed for "last four digits" lookups
+        tokens.add((PHONE, digits))
+        tokens.add((PHONE, digits[-10:]))
+        tokens.add((PHONE_SUFFIX, digits[::-1]))
+
+    if uhid:
+        tokens.add((UHID, normalize(uhid)))
+        sequence = uhid.rsplit('-', 1)[-1]
+        if sequence.isdigit():
+            tokens.add((UHID, sequence.lstrip('0') or '0'))
+    return {(kind, token[:MAX_TOKEN_LENGTH]) for kind, token in tokens if token}
+
+
+def _prefix(term):
+    """token >= term AND token < successor: a plain index range scan on any database"""
+    return Q(token__gte=term, token__lt=term[:-1] + chr(ord(term[-1]) + 1))
+
+
+def _term_conditions(term):
+    """(condition, weight) pairs for one search term, strongest first"""
+    conditions = [
+        (Q(kind=UHID, token=term), 120),
+        (Q(kind=NAME, token=term), 100),
+    ]
+    if term.isdigit() and term.lstrip('0') != term:
+        # "000123" is typed for sequence 123 of a UHID
+        conditions.append((Q(kind=UHID, token=term.lstrip('0') or '0'), 120))
+    digits = _digits(term)
+    if digits and len(digits) >= 3:
+        conditions += [
+            (Q(kind=PHONE) & _prefix(digits), 90),
+            (Q(kind=PHONE_SUFFIX) & _prefix(digits[::-1]), 70),
+        ]
+    conditions += [
+        (Q(kind=UHID) & _prefix(term), 80),
+        (Q(kind=NAME) & _prefix(term), 60),
+    ]
+    if term.isalpha() and len(term) >= 3:
+        conditions.append((Q(kind=PHONETIC, token=soundex(term)), 40))
+    return conditions
+
+
+def rank_patients(query, limit=None, fuzzy=True):
+    """
+    Return [(patient_id, score), ...] best first for a free-text query.
+
+    Every term must match the patient by exact, prefix, phone or UHID
+    token, or by sound. If that finds fewer than `limit` patients, terms
+    may also match by shared name trigrams, which tolerates typos.
+    Each pass is a single grouped query over PatientSearchToken.
+    """
+    from .models import PatientSearchToken
+
+    limit = limit or settings.PATIENT_SEARCH_MAX_RESULTS
+    terms = list(dict.fromkeys(words(query)))[:5]
+    if not terms:
+        return []
+
+    ranked = _ranked_query(PatientSearchToken.objects.all(), terms, limit, fuzzy=False)
+    if fuzzy and len(ranked) < limit:
+        # Trigram rows are only scanned when the cheap pass comes up short;
+        # exact and prefix matches still outrank typo matches here
+        ranked = _ranked_query(PatientSearchToken.objects.all(), terms, limit, fuzzy=True)
+    return ranked
+
+
+def _ranked_query(tokens, terms, limit, fuzzy):
+    where = Q()
+    annotations = {}
+    having = Q()
+    score = Value(0)
+    for i, term in enumerate(terms):
+        conditions = _term_conditions(term)
+        for condition, _ in conditions:
+            where |= condition
+        annotations[f'exact_{i}'] = Max(Case(
+            *[When(condition, then=Value(weight)) for condition, weight in conditions],
+            output_field=IntegerField(),
+        ))
+        matched = Q(**{f'exact_{i}__isnull': False})
+        term_score = Coalesce(F(f'exact_{i}'), Value(0))
+
+        if fuzzy and len(term) >= 3:
+            term_trigrams = sorted(trigrams(term))
+            trigram_match = Q(kind=TRIGRAM, token__in=term_trigrams)
+            where |= trigram_match
+            annotations[f'fuzzy_{i}'] = Count('pk', filter=trigram_match)
+            # About half the trigrams in common tolerates one or two typos
+            matched |= Q(**{f'fuzzy_{i}__gte': max(2, (len(term_trigrams) + 1) // 2)})
+            # A fuzzy-only match scores at most 30, below any exact or prefix match
+            term_score = Coalesce(F(f'exact_{i}'), F(f'fuzzy_{i}') * 30 / len(term_trigrams))
+
+        having &= matched
+        score = score + term_score
+
+    rows = (tokens.filter(where)
+            .values('patient_id')
+            .annotate(**annotations)
+            .filter(having)
+            .annotate(score=score)
+            .order_by('-score', '-patient_id')
+            .values_list('patient_id', 'score')[:limit])
+    return list(rows)
+
+
+class PatientSearchFilter(BaseFilterBackend):
+    """
+    Ranked ?search= for patients using the PatientSearchToken index in place
+    of SearchFilter's icontains scans. Results keep rank order unless the
+    client asks for an explicit ?ordering=, and are limited to the best
+    PATIENT_SEARCH_MAX_RESULTS matches.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not normalize(query):
+            return queryset
+
+        ranked = rank_patients(query)
+        ids = [patient_id for patient_id, _ in ranked]
+        queryset = queryset.filter(pk__in=ids)
+        if ids and 'ordering' not in request.query_params:
+            rank = Case(*[When(pk=patient_id, then=Value(position)) for position, patient_id in enumerate(ids)],
+                        output_field=IntegerField())
+            queryset = queryset.order_by(rank)
+        return queryset
+
+
+def index_patient(patient):
+    """Rewrite the search tokens of one patient"""
+    from .models import PatientSearchToken
+
+    user = patient.user
+    tokens = patient_tokens(user.first_name, user.last_name, user.phone, patient.uhid)
+    PatientSearchToken.objects.filter(patient=patient).delete()
+    PatientSearchToken.objects.bulk_create(
+        PatientSearchToken(patient=patient, kind=kind, token=token) for kind, token in tokens
+    )
+
+
+def rebuild_search_index(batch_size=5000):
+    """Regenerate every patient's tokens in bulk; returns the number of patients indexed"""
+    from .models import Patient, PatientSearchToken
+
+    PatientSearchToken.objects.all().delete()
+    batch = []
+    indexed = 0
+    patients = Patient.objects.values_list('id', 'user__first_name', 'user__last_name', 'user__phone', 'uhid')
+    for patient_id, first_name, last_name, phone, uhid in patients.iterator(chunk_size=2000):
+        batch.extend(
+            PatientSearchToken(patient_id=patient_id, kind=kind, token=token)
+            for kind, token in patient_tokens(first_name, last_name, phone, uhid)
+        )
+        indexed += 1
+        if len(batch) >= batch_size:
+            PatientSearchToken.objects.bulk_create(batch)
+            batch = []
+    PatientSearchToken.objects.bulk_create(batch)
+    return indexed
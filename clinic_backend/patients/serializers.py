@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Patient
 from accounts.serializers import UserSerializer
+from clinic_backend.serializers import DynamicFieldsMixin
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = serializers.IntegerField(write_only=True, required=True)
     user_details = UserSerializer(source='user', read_only=True)
     user_name = serializers.CharField(source='user.full_name', read_only=True)
@@ -99,6 +100,6 @@ class PatientSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Override to_representation to include user object for read operations"""
         ret = super().to_representation(instance)
-        if instance and hasattr(instance, 'user'):
-            ret['user'] = instance.user.id
+        if instance and 'user' in self.fields:
+            ret['user'] = instance.user_id
         return ret
\ No newline at end of file
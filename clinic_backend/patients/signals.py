@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from accounts.models import User
+from .models import Patient
+from .search import index_patient
+
+
+@receiver(post_save, sender=Patient)
+def index_saved_patient(sender, instance, **kwargs):
+    """Keep the patient's search tokens in step with their UHID"""
+    index_patient(instance)
+
+
+@receiver(post_save, sender=User)
+def index_patient_user(sender, instance, created, **kwargs):
+    """Names and phone live on the user row, so re-index its patient on change"""
+    if created or instance.role != 'PATIENT':
+        # A new patient's profile is created, and indexed, after the user
+        return
+    patient = Patient.objects.filter(user=instance).first()
+    if patient is not None:
+        index_patient(patient)
@@ -0,0 +1,163 @@
+# patients/timeline.py
+
+import base64
+import heapq
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from appointments.links import visit_time
+
+APPOINTMENT, BED_ALLOCATION, BED_REQUEST, INVOICE, PRESCRIPTION = (
+    'appointment', 'bed_allocation', 'bed_request', 'invoice', 'prescription'
+)
+
+
+def _doctor_name(doctor):
+    return f"Dr. {doctor.user.full_name}" if doctor else None
+
+
+def _appointment_entry(appointment):
+    return {
+        'doctor_name': _doctor_name(appointment.doctor),
+        'status': appointment.status,
+        'case_type': appointment.case_type,
+        'reason': appointment.reason,
+    }
+
+
+def _prescription_entry(prescription):
+    return {
+        'appointment': prescription.appointment_id,
+        'doctor_name': _doctor_name(prescription.doctor),
+        'diagnosis': prescription.diagnosis,
+        'follow_up_date': prescription.follow_up_date,
+        'bed_required': prescription.bed_required,
+    }
+
+
+def _invoice_entry(billing):
+    return {
+        'appointment': billing.appointment_id,
+        'invoice_number': billing.invoice_number,
+        'final_amount': billing.final_amount,
+        'paid_amount': billing.paid_amount,
+        'payment_status': billing.payment_status,
+    }
+
+
+def _bed_allocation_entry(allocation):
+    return {
+        'ward_name': allocation.bed.ward.name,
+        'bed_number': allocation.bed.bed_number,
+        'status': allocation.status,
+        'discharge_date': allocation.discharge_date,
+        'payment_status': allocation.payment_status,
+    }
+
+
+def _bed_request_entry(bed_request):
+    return {
+        'appointment': bed_request.appointment_id,
+        'doctor_name': _doctor_name(bed_request.doctor),
+        'status': bed_request.status,
+        'expected_bed_days': bed_request.expected_bed_days,
+    }
+
+
+def _sources():
+    """
+    (kind, queryset, sort fields, timestamp of a row, cursor timestamp as
+    sort field values, entry builder) per record type. Each queryset is
+    ordered by its sort fields then id, descending, along a
+    (patient, ..., -id) index.
+    """
+    from appointments.models import Appointment
+    from beds.models import BedAllocation, BedRequest
+    from billing.models import Billing
+    from records.models import Prescription
+
+    def split(ts):
+        ts = timezone.localtime(ts)
+        return [ts.date(), ts.time()]
+
+    return [
+        (APPOINTMENT, Appointment.objects.select_related('doctor__user'),
+         ('appointment_date', 'appointment_time'),
+         lambda row: visit_time(row.appointment_date, row.appointment_time), split, _appointment_entry),
+        (BED_ALLOCATION, BedAllocation.objects.select_related('bed__ward'),
+         ('admission_date',), lambda row: row.admission_date, lambda ts: [ts], _bed_allocation_entry),
+        (BED_REQUEST, BedRequest.objects.select_related('doctor__user'),
+         ('created_at',), lambda row: row.created_at, lambda ts: [ts], _bed_request_entry),
+        (INVOICE, Billing.objects.all(),
+         ('created_at',), lambda row: row.created_at, lambda ts: [ts], _invoice_entry),
+        (PRESCRIPTION, Prescription.objects.select_related('doctor__user'),
+         ('created_at',), lambda row: row.created_at, lambda ts: [ts], _prescription_entry),
+    ]
+
+
+def _before(kind, fields, values, position):
+    """
+    Rows of `kind` strictly after `position` = (timestamp, kind, id) in the
+    timeline's descending (timestamp, kind, id) order, as a lexicographic
+    comparison over the source's own sort fields.
+    """
+    _, position_kind, position_id = position
+    condition = Q()
+    equal_prefix = {}
+    for field, value in zip(fields, values):
+        condition |= Q(**equal_prefix, **{f'{field}__lt': value})
+        equal_prefix[field] = value
+    # Ties on the timestamp fall back to the kind, then the id
+    if kind < position_kind:
+        condition |= Q(**equal_prefix)
+    elif kind == position_kind:
+        condition |= Q(**equal_prefix, id__lt=position_id)
+    return condition
+
+
+def encode_cursor(position):
+    timestamp, kind, pk = position
+    raw = json.dumps([timestamp.isoformat(), kind, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, kind, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None or not isinstance(kind, str) or not isinstance(pk, int):
+            raise ValueError
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+    return timestamp, kind, pk
+
+
+def patient_timeline(patient_id, limit, position=None):
+    """
+    The patient's appointments, prescriptions, invoices, bed allocations
+    and bed requests, newest first, after `position` when paging.
+
+    Runs one query per record type, each limited to limit + 1 rows read
+    from its patient index, then k-way merges the already sorted streams.
+    Returns (entries, position of the last entry or None when this is
+    the final page).
+    """
+    streams = []
+    for kind, queryset, fields, timestamp_of, values_of, build in _sources():
+        queryset = queryset.filter(patient_id=patient_id)
+        if position is not None:
+            queryset = queryset.filter(_before(kind, fields, values_of(position[0]), position))
+        rows = queryset.order_by(*[f'-{field}' for field in fields], '-id')[:limit + 1]
+        streams.append([(timestamp_of(row), kind, row.id, row, build) for row in rows])
+
+    merged = heapq.merge(*streams, key=lambda item: item[:3], reverse=True)
+    page = []
+    for timestamp, kind, pk, row, build in merged:
+        if len(page) == limit:
+            return page, (page[-1]['timestamp'], page[-1]['type'], page[-1]['id'])
+        page.append({'type': kind, 'id': pk, 'timestamp': timestamp, **build(row)})
+    return page, None
@@ -1,14 +1,24 @@
+from django.conf import settings
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.pagination import _positive_int
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Patient
 from .serializers import PatientSerializer
+from .search import PatientSearchFilter
+from .timeline import decode_cursor, encode_cursor, patient_timeline
 from accounts.permissions import IsAdminOrStaff, IsPatient
+from appointments.models import DoctorPatientLink
+from clinic_backend.conditional import ConditionalGetMixin
+from clinic_backend.serializers import OptimizedQuerysetMixin
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = PatientSerializer
     permission_classes = [IsAuthenticated]
+    etag_timestamp_fields = ('updated_at', 'user__updated_at')
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -17,9 +27,9 @@ class PatientViewSet(viewsets.ModelViewSet):
             return [IsAdminOrStaff()]
         return [IsAuthenticated()]
     
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['user__first_name', 'user__last_name', 'user__phone', 'uhid']
-    ordering_fields = ['created_at', 'user__first_name']
+    # Ranked search runs last so its order survives unless ?ordering= is given
+    filter_backends = [filters.OrderingFilter, PatientSearchFilter]
+    ordering_fields = ['created_at', 'user__first_name', 'user__full_name']
     ordering = ['-created_at']
     
     def create(self, request, *args, **kwargs):
@@ -48,10 +58,9 @@ class PatientViewSet(viewsets.ModelViewSet):
         elif user.role == 'DOCTOR':
             if hasattr(user, 'doctor_profile'):
                 doctor_id = user.doctor_profile.id
-                # Filter patients who have appointments with this doctor
-                return queryset.filter(
-                    appointments__doctor_id=doctor_id
-                ).distinct()
+                # Patients who have appointments with this doctor; the link
+                # table holds one row per pair, so no DISTINCT is needed
+                return queryset.filter(doctor_links__doctor_id=doctor_id)
             return Patient.objects.none()
             
         return Patient.objects.none()
@@ -62,14 +71,35 @@ class PatientViewSet(viewsets.ModelViewSet):
         
         # Additional check for doctors
         if request.user.role == 'DOCTOR':
-            # Verify this patient is in the doctor's queryset
-            if not self.get_queryset().filter(id=instance.id).exists():
+            # Verify the doctor has seen this patient
+            if not DoctorPatientLink.objects.filter(
+                doctor_id=request.user.doctor_profile.id, patient_id=instance.id
+            ).exists():
                 from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied("You do not have access to this patient's records.")
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """Appointments, prescriptions, invoices and bed history of one patient, newest first"""
+        patient = self.get_object()
+        try:
+            limit = _positive_int(request.query_params.get('page_size', api_settings.PAGE_SIZE), strict=True,
+                                  cutoff=settings.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "page_size must be a positive integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = request.query_params.get('cursor')
+        position = decode_cursor(cursor) if cursor else None
+        entries, last = patient_timeline(patient.id, limit, position)
+
+        next_link = None
+        if last is not None:
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', encode_cursor(last))
+        return Response({'next': next_link, 'results': entries})
+
     @action(detail=False, methods=['get', 'put', 'patch'])
     def my_profile(self, request):
         """Get or update patient's own profile - auto-creates one if missing"""
@@ -5,11 +5,13 @@ from .models import Prescription
 class PrescriptionAdmin(admin.ModelAdmin):
     list_display = ['patient', 'doctor', 'diagnosis', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['patient__user__email', 'doctor__user__email', 'diagnosis']
+    search_fields = ['patient__user__email', 'doctor__user__email', 'patient__user__full_name', 'doctor__user__full_name', 'diagnosis']
     readonly_fields = ['created_at', 'updated_at']
     
     def patient(self, obj):
         return obj.patient.user.full_name
+    patient.admin_order_field = 'patient__user__full_name'
     
     def doctor(self, obj):
-        return f"Dr. {obj.doctor.user.full_name}"
\ No newline at end of file
+        return f"Dr. {obj.doctor.user.full_name}"
+    doctor.admin_order_field = 'doctor__user__full_name'
\ No newline at end of file
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+
+SQLITE_INDEX_SQL = [
+    # External content: the FTS table stores only the index and reads the
+    # text back from `prescriptions` for snippets
+    """CREATE VIRTUAL TABLE prescription_fts USING fts5(
+        diagnosis, medications, instructions,
+        content='prescriptions', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER prescription_fts_insert AFTER INSERT ON prescriptions BEGIN
+        INSERT INTO prescription_fts(rowid, diagnosis, medications, instructions)
+        VALUES (new.id, new.diagnosis, new.medications, coalesce(new.instructions, ''));
+    END""",
+    """CREATE TRIGGER prescription_fts_delete AFTER DELETE ON prescriptions BEGIN
+        INSERT INTO prescription_fts(prescription_fts, rowid, diagnosis, medications, instructions)
+        VALUES ('delete', old.id, old.diagnosis, old.medications, coalesce(old.instructions, ''));
+    END""",
+    """CREATE TRIGGER prescription_fts_update AFTER UPDATE OF diagnosis, medications, instructions
+    ON prescriptions BEGIN
+        INSERT INTO prescription_fts(prescription_fts, rowid, diagnosis, medications, instructions)
+        VALUES ('delete', old.id, old.diagnosis, old.medications, coalesce(old.instructions, ''));
+        INSERT INTO prescription_fts(rowid, diagnosis, medications, instructions)
+        VALUES (new.id, new.diagnosis, new.medications, coalesce(new.instructions, ''));
+    END""",
+    "INSERT INTO prescription_fts(prescription_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS prescription_fts_update',
+    'DROP TRIGGER IF EXISTS prescription_fts_delete',
+    'DROP TRIGGER IF EXISTS prescription_fts_insert',
+    'DROP TABLE IF EXISTS prescription_fts',
+]
+
+POSTGRESQL_INDEX_SQL = [
+    # A stored generated column is recomputed by PostgreSQL on every write
+    """ALTER TABLE prescriptions ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(medications, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(instructions, '')), 'C')
+    ) STORED""",
+    'CREATE INDEX rx_search_vector_idx ON prescriptions USING GIN (search_vector)',
+]
+
+POSTGRESQL_DROP_SQL = [
+    'DROP INDEX IF EXISTS rx_search_vector_idx',
+    'ALTER TABLE prescriptions DROP COLUMN IF EXISTS search_vector',
+]
+
+INDEX_SQL = {'sqlite': SQLITE_INDEX_SQL, 'postgresql': POSTGRESQL_INDEX_SQL}
+DROP_SQL = {'sqlite': SQLITE_DROP_SQL, 'postgresql': POSTGRESQL_DROP_SQL}
+
+
+def create_search_index(apps, schema_editor):
+    for statement in INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    for statement in DROP_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('records', '0009_prescription_rx_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
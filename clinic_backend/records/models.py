@@ -1,3 +1,4 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from appointments.models import Appointment
 from doctors.models import Doctor
@@ -21,6 +22,10 @@ class Prescription(models.Model):
     class Meta:
         db_table = 'prescriptions'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='rx_created_idx'),
+            models.Index(fields=['patient', '-created_at', '-id'], name='rx_patient_created_idx'),
+        ]
     
     def __str__(self):
         return f"Prescription for {self.patient.user.full_name} by Dr. {self.doctor.user.full_name}"
@@ -29,7 +34,6 @@ class Prescription(models.Model):
     def billing(self):
         """Get associated billing record through appointment"""
         try:
-            from billing.models import Billing
-            return Billing.objects.get(appointment=self.appointment)
-        except:
+            return self.appointment.billing
+        except ObjectDoesNotExist:
             return None
\ No newline at end of file
@@ -0,0 +1,143 @@
+# records/search.py
+
+import html
+
+from django.conf import settings
+from django.db import connection
+
+from patients.search import words
+
+# Searchable columns with their weight: PostgreSQL tsvector weight label and
+# SQLite bm25() column weight
+COLUMNS = (
+    ('diagnosis', 'A', 10.0),
+    ('medications', 'B', 5.0),
+    ('instructions', 'C', 1.0),
+)
+COLUMN_NAMES = tuple(name for name, _, _ in COLUMNS)
+
+# Private-use characters mark highlights inside the database; they are
+# turned into <mark> tags only after the surrounding text is HTML-escaped
+START_MARK, STOP_MARK = '\ue000', '\ue001'
+SNIPPET_WORDS = 24
+
+# The index (an FTS5 table on SQLite, a tsvector column on PostgreSQL) is
+# created by records/migrations/0010; other databases have no prescription search
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+
+def is_supported(vendor=None):
+    return (vendor or connection.vendor) in SUPPORTED_VENDORS
+
+
+def parse_terms(query=None, **columns):
+    """
+    [(column or None, word), ...] from a free-text query matched against
+    every column plus per-column queries, e.g. medications='metformin'.
+    Only letters and digits survive, so terms are safe to splice into
+    MATCH / to_tsquery syntax.
+    """
+    terms = [(None, word) for word in words(query)]
+    for column in COLUMN_NAMES:
+        terms += [(column, word) for word in words(columns.get(column))]
+    return list(dict.fromkeys(terms))[:10]
+
+
+# Terms are whole words after stemming ('tablets' finds 'tablet'). Prefix
+# queries are left out on purpose: each one merges the postings of every
+# word sharing the prefix, which costs hundreds of milliseconds at scale.
+
+def _sqlite_match(terms):
+    return ' AND '.join(f'{column} : "{word}"' if column else f'"{word}"' for column, word in terms)
+
+
+def _postgresql_tsquery(terms):
+    weights = {name: weight for name, weight, _ in COLUMNS}
+    return ' & '.join(f'{word}:{weights[column]}' if column else word for column, word in terms)
+
+
+def _scope_sql(scope):
+    conditions, params = [], []
+    for column, value in scope.items():
+        conditions.append(f'p.{column} = %s')
+        params.append(value)
+    return ''.join(f' AND {condition}' for condition in conditions), params
+
+
+def _sqlite_search(cursor, terms, scope, limit, offset, candidates):
+    weights = ', '.join(str(weight) for _, _, weight in COLUMNS)
+    match = _sqlite_match(terms)
+    scope_sql, scope_params = _scope_sql(scope)
+    cursor.execute(
+        f'SELECT id, score FROM ('
+        f'SELECT prescription_fts.rowid AS id, -bm25(prescription_fts, {weights}) AS score '
+        f'FROM prescription_fts JOIN prescriptions p ON p.id = prescription_fts.rowid '
+        f'WHERE prescription_fts MATCH %s{scope_sql} '
+        f'ORDER BY prescription_fts.rowid DESC LIMIT %s'
+        f') ORDER BY score DESC, id DESC LIMIT %s OFFSET %s',
+        [match] + scope_params + [candidates, limit, offset],
+    )
+    ranked = cursor.fetchall()
+    if not ranked:
+        return []
+
+    # snippet() is far costlier than bm25(), so it only runs for the page
+    snippets = ', '.join(
+        f"snippet(prescription_fts, {i}, %s, %s, '…', {SNIPPET_WORDS})" for i in range(len(COLUMNS))
+    )
+    ids = [prescription_id for prescription_id, _ in ranked]
+    cursor.execute(
+        f'SELECT rowid, {snippets} FROM prescription_fts '
+        f'WHERE prescription_fts MATCH %s AND rowid IN ({", ".join(["%s"] * len(ids))})',
+        [START_MARK, STOP_MARK] * len(COLUMNS) + [match] + ids,
+    )
+    highlights = {row[0]: row[1:] for row in cursor.fetchall()}
+    return [(prescription_id, score, highlights.get(prescription_id, ('',) * len(COLUMNS)))
+            for prescription_id, score in ranked]
+
+
+def _postgresql_search(cursor, terms, scope, limit, offset, candidates):
+    headlines = ', '.join(f"ts_headline('english', coalesce(p.{name}, ''), q.query, %s)" for name, _, _ in COLUMNS)
+    scope_sql, scope_params = _scope_sql(scope)
+    # Only the page of best matches is fetched back for the (costly) headlines
+    cursor.execute(
+        f"WITH q AS (SELECT to_tsquery('english', %s) AS query), "
+        f'candidates AS ('
+        f'SELECT p.id, p.search_vector FROM prescriptions p, q '
+        f'WHERE p.search_vector @@ q.query{scope_sql} '
+        f'ORDER BY p.id DESC LIMIT %s), '
+        f'ranked AS ('
+        f'SELECT c.id, ts_rank_cd(c.search_vector, q.query) AS score FROM candidates c, q '
+        f'ORDER BY score DESC, c.id DESC LIMIT %s OFFSET %s) '
+        f'SELECT ranked.id, ranked.score, {headlines} '
+        f'FROM ranked JOIN prescriptions p ON p.id = ranked.id, q '
+        f'ORDER BY ranked.score DESC, ranked.id DESC',
+        [_postgresql_tsquery(terms)] + scope_params + [candidates, limit, offset]
+        + [f'StartSel={START_MARK}, StopSel={STOP_MARK}, MaxWords={SNIPPET_WORDS}, MinWords=8'] * len(COLUMNS),
+    )
+    return [(row[0], row[1], row[2:]) for row in cursor.fetchall()]
+
+
+def highlight(text):
+    """HTML-escape a database snippet and wrap its matches in <mark>"""
+    return html.escape(text or '').replace(START_MARK, '<mark>').replace(STOP_MARK, '</mark>')
+
+
+def search_prescriptions(terms, scope=None, limit=20, offset=0):
+    """
+    Ranked full-text matches as [(prescription_id, score, {column: snippet}), ...],
+    best first. `scope` maps prescription columns (patient_id, doctor_id)
+    to required values and is applied inside the index query, so scoped
+    searches still return full pages.
+
+    Only the newest PRESCRIPTION_SEARCH_MAX_CANDIDATES matches are ranked,
+    which keeps very common words from scoring millions of rows.
+    """
+    builders = {'sqlite': _sqlite_search, 'postgresql': _postgresql_search}
+    with connection.cursor() as cursor:
+        rows = builders[connection.vendor](cursor, terms, scope or {}, limit, offset,
+                                           settings.PRESCRIPTION_SEARCH_MAX_CANDIDATES)
+    return [
+        (prescription_id, float(score), {name: highlight(snippet) for name, snippet in zip(COLUMN_NAMES, snippets)})
+        for prescription_id, score, snippets in rows
+    ]
@@ -2,8 +2,9 @@ from rest_framework import serializers
 from .models import Prescription
 from appointments.models import Appointment
 from beds.models import BedRequest
+from clinic_backend.serializers import DynamicFieldsMixin
 
-class PrescriptionSerializer(serializers.ModelSerializer):
+class PrescriptionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.user.full_name', read_only=True)
     patient_uhid = serializers.CharField(source='patient.uhid', read_only=True)
     doctor_name = serializers.CharField(source='doctor.user.full_name', read_only=True)
@@ -23,6 +24,16 @@ class PrescriptionSerializer(serializers.ModelSerializer):
             'bed_required', 'expected_bed_days'
         ]
         read_only_fields = ['created_at', 'updated_at', 'patient', 'doctor', 'patient_name', 'patient_uhid', 'doctor_name', 'appointment_reason', 'billing_status', 'billing_invoice']
+        expandable_fields = {
+            'appointment': 'appointments.serializers.AppointmentSerializer',
+            'patient': 'patients.serializers.PatientSerializer',
+            'doctor': 'doctors.serializers.DoctorSerializer',
+        }
+        field_relations = {
+            'billing_status': ['appointment__billing'],
+            'billing_invoice': ['appointment__billing'],
+            'patient_age': ['patient'],
+        }
     
     def get_billing_status(self, obj):
         """Get associated billing payment status"""
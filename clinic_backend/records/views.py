@@ -1,14 +1,28 @@
-from rest_framework import viewsets
+from django.conf import settings
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import _positive_int
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Prescription
 from .serializers import PrescriptionSerializer
+from .search import COLUMN_NAMES, is_supported, parse_terms, search_prescriptions
 from support.models import Notification
+from clinic_backend.pagination import CreatedAtCursorPagination
+from clinic_backend.conditional import ConditionalGetMixin
+from clinic_backend.serializers import OptimizedQuerysetMixin
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
+class PrescriptionViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = PrescriptionSerializer
     permission_classes = [IsAuthenticated]
+    # Only role and profile ids are read here, so signed token claims suffice
+    stateless_auth_actions = ('list', 'retrieve', 'search')
+    etag_timestamp_fields = ('updated_at', 'patient__updated_at', 'patient__user__updated_at',
+                             'doctor__user__updated_at', 'appointment__updated_at',
+                             'appointment__billing__updated_at')
+    pagination_class = CreatedAtCursorPagination
     
     def perform_create(self, serializer):
         prescription = serializer.save()
@@ -62,6 +76,73 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(prescriptions, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over diagnosis, medications and instructions.
+        ?q= matches any of them; ?diagnosis=, ?medications= and ?instructions=
+        match one column each, and every word must match.
+        Patients only ever search their own prescriptions.
+        """
+        if not is_supported():
+            return Response({"error": "Prescription search is not available on this database"},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+        params = request.query_params
+        terms = parse_terms(params.get('q'), **{column: params.get(column) for column in COLUMN_NAMES})
+        if not terms:
+            return Response({"error": "A search term is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = {}
+        try:
+            for field in ('patient_id', 'doctor_id'):
+                if params.get(field):
+                    scope[field] = int(params[field])
+            page_size = _positive_int(params.get('page_size', api_settings.PAGE_SIZE), strict=True,
+                                      cutoff=settings.MAX_PAGE_SIZE)
+            page = _positive_int(params.get('page', 1), strict=True)
+        except ValueError:
+            return Response({"error": "patient_id, doctor_id, page and page_size must be positive integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        if user.role == 'PATIENT':
+            if not hasattr(user, 'patient_profile'):
+                return Response({'next': None, 'results': []})
+            scope['patient_id'] = user.patient_profile.id
+        elif user.role not in ['ADMIN', 'STAFF', 'DOCTOR']:
+            return Response({'next': None, 'results': []})
+
+        # One row past the page tells whether another page follows
+        matches = search_prescriptions(terms, scope, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_next = len(matches) > page_size
+        matches = matches[:page_size]
+        prescriptions = (Prescription.objects
+                         .select_related('patient__user', 'doctor__user')
+                         .in_bulk([prescription_id for prescription_id, _, _ in matches]))
+
+        results = []
+        for prescription_id, score, highlights in matches:
+            prescription = prescriptions.get(prescription_id)
+            if prescription is None:
+                continue
+            results.append({
+                'id': prescription.id,
+                'score': round(score, 4),
+                'patient': prescription.patient_id,
+                'patient_name': prescription.patient.user.full_name,
+                'doctor': prescription.doctor_id,
+                'doctor_name': prescription.doctor.user.full_name,
+                'appointment': prescription.appointment_id,
+                'created_at': prescription.created_at,
+                'follow_up_date': prescription.follow_up_date,
+                'highlights': highlights,
+            })
+
+        next_link = None
+        if has_next:
+            next_link = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        return Response({'next': next_link, 'results': results})
+
     @action(detail=False, methods=['get'])
     def my_prescriptions(self, request):
         """Get current user's prescriptions"""
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from .models import Notification, Query
+from clinic_backend.serializers import DynamicFieldsMixin
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     
     class Meta:
@@ -10,7 +11,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at']
 
 
-class QuerySerializer(serializers.ModelSerializer):
+class QuerySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
     
@@ -2,13 +2,21 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.utils import timezone
 from .models import Notification, Query
 from .serializers import NotificationSerializer, QuerySerializer
 from accounts.permissions import IsAdmin
+from clinic_backend.pagination import CreatedAtCursorPagination
+from clinic_backend.conditional import ConditionalGetMixin
+from clinic_backend.serializers import OptimizedQuerysetMixin
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    # Only role and profile ids are read here, so signed token claims suffice
+    stateless_auth_actions = ('list', 'retrieve', 'unread')
+    pagination_class = CreatedAtCursorPagination
+    pagination_count_mode = 'cached'
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).select_related('user')
@@ -24,7 +32,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read"""
-        self.get_queryset().filter(is_read=False).update(is_read=True)
+        # update() skips auto_now, and updated_at feeds the list ETag
+        self.get_queryset().filter(is_read=False).update(is_read=True, updated_at=timezone.now())
         return Response({'message': 'All notifications marked as read'})
 
     @action(detail=False, methods=['get'])
@@ -35,7 +44,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class QueryViewSet(viewsets.ModelViewSet):
+class QueryViewSet(ConditionalGetMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = QuerySerializer
     permission_classes = [IsAuthenticated]
     